@@ -18,3 +18,13 @@ def vanilla_deployment():
 @pytest.fixture
 def dask_deployment(client):  # noqa: F811
     return znflow.deployment.DaskDeployment(client=client)
+
+
+@pytest.fixture
+def parallel_deployment():
+    return znflow.deployment.ParallelDeployment()
+
+
+@pytest.fixture
+def process_deployment():
+    return znflow.deployment.ParallelDeployment(processes=True)
@@ -523,3 +523,35 @@ def test_extend_combined_connection():
 
         with pytest.raises(TypeError):
             a.extend(a + b)
+
+
+def test_combine_matches_sum():
+    with znflow.DiGraph():
+        futures = [create_list(x) for x in range(4)]
+        nodes = [CreateList(x) for x in range(2)]
+        inputs = [
+            futures,
+            [futures[0]],
+            [futures[0] + futures[1], futures[2], futures[3] + futures[0]],
+            [futures[0], futures[1] + futures[2], nodes[0].outs],
+            [nodes[0].outs, nodes[1].outs, futures[3]],
+        ]
+        for args in inputs:
+            assert znflow.combine(*args) == sum(args, [])
+        with pytest.raises(ValueError, match="multiple slices"):
+            znflow.combine((futures[0] + futures[1])[:2], futures[2])
+
+    assert znflow.combine([1, 2], [3], []) == [1, 2, 3]
+    assert znflow.combine() == []
+
+
+def test_combine_many():
+    with znflow.DiGraph() as graph:
+        futures = [create_list(2) for _ in range(20000)]
+        combined = znflow.combine(futures, return_dict_attr="uuid")
+        outs = znflow.combine(futures)
+    assert len(combined) == 20000
+    assert isinstance(outs, CombinedConnections)
+    assert len(outs) == 20000
+    graph.run()
+    assert outs.result == [0, 1] * 20000
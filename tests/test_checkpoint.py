@@ -0,0 +1,171 @@
+"""Test checkpointing and resuming graph runs."""
+
+import dataclasses
+
+import pytest
+
+import znflow
+
+RUNS = []
+FAIL_AT = {"value": None}
+
+
+@dataclasses.dataclass
+class AddOne(znflow.Node):
+    inputs: int
+    outputs: int = None
+
+    def run(self):
+        if self.inputs == FAIL_AT["value"]:
+            raise RuntimeError("Simulated crash")
+        RUNS.append(self.inputs)
+        self.outputs = self.inputs + 1
+
+
+@znflow.nodify
+def add_one(value):
+    RUNS.append(value)
+    return value + 1
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    RUNS.clear()
+    FAIL_AT["value"] = None
+    yield
+    FAIL_AT["value"] = None
+
+
+DEPLOYMENTS = ["vanilla_deployment", "dask_deployment", "parallel_deployment"]
+
+
+def assert_runs(deployment, expected):
+    """Check the recorded runs, unless the nodes run in Dask worker processes."""
+    if not isinstance(deployment, znflow.deployment.DaskDeployment):
+        assert RUNS == expected
+
+
+def build_graph(**kwargs):
+    with znflow.DiGraph(**kwargs) as graph:
+        node = AddOne(inputs=0)
+        for _ in range(3):
+            node = AddOne(inputs=node.outputs)
+        result = add_one(node.outputs)
+    return graph, node, result
+
+
+@pytest.mark.parametrize("deployment", DEPLOYMENTS)
+def test_checkpoint(request, deployment, tmp_path):
+    deployment = request.getfixturevalue(deployment)
+    graph, node, result = build_graph(deployment=deployment)
+    graph.run(checkpoint=tmp_path)
+    assert result.result == 5
+
+    assert len(list((tmp_path / "nodes").iterdir())) == 5
+    assert graph.deployment.checkpoint is None
+
+
+@pytest.mark.parametrize("deployment", DEPLOYMENTS)
+def test_resume(request, deployment, tmp_path):
+    graph, node, result = build_graph()
+    FAIL_AT["value"] = 2
+    with pytest.raises(RuntimeError):
+        graph.run(checkpoint=tmp_path)
+    assert RUNS == [0, 1]
+
+    FAIL_AT["value"] = None
+    graph.deployment = request.getfixturevalue(deployment)
+    graph.deployment.set_graph(graph)
+    graph.run(resume_from=tmp_path)
+    assert_runs(graph.deployment, [0, 1, 2, 3, 4])
+    assert node.outputs == 4
+    assert result.result == 5
+
+
+@pytest.mark.parametrize("deployment", DEPLOYMENTS)
+def test_resume_rebuilt_graph(request, deployment, tmp_path):
+    graph, *_ = build_graph()
+    FAIL_AT["value"] = 3
+    with pytest.raises(RuntimeError):
+        graph.run(checkpoint=tmp_path)
+    assert RUNS == [0, 1, 2]
+
+    # e.g. in a new process after a crash
+    FAIL_AT["value"] = None
+    deployment = request.getfixturevalue(deployment)
+    graph, node, result = build_graph(deployment=deployment)
+    graph.run(resume_from=tmp_path)
+    assert_runs(deployment, [0, 1, 2, 3, 4])
+    assert node.outputs == 4
+    assert result.result == 5
+
+    # everything is checkpointed now
+    graph, node, result = build_graph()
+    graph.run(resume_from=tmp_path)
+    assert_runs(deployment, [0, 1, 2, 3, 4])
+    assert result.result == 5
+
+
+@pytest.mark.parametrize("deployment", DEPLOYMENTS)
+def test_resume_to_new_checkpoint(request, deployment, tmp_path):
+    graph, *_ = build_graph()
+    FAIL_AT["value"] = 3
+    with pytest.raises(RuntimeError):
+        graph.run(checkpoint=tmp_path / "a")
+
+    FAIL_AT["value"] = None
+    graph, node, result = build_graph(deployment=request.getfixturevalue(deployment))
+    graph.run(resume_from=tmp_path / "a", checkpoint=tmp_path / "b")
+    assert result.result == 5
+    assert len(list((tmp_path / "a" / "nodes").iterdir())) == 3
+    assert len(list((tmp_path / "b" / "nodes").iterdir())) == 5
+
+
+def test_resume_mismatch(tmp_path):
+    graph, *_ = build_graph()
+    graph.run(checkpoint=tmp_path)
+
+    with znflow.DiGraph() as graph:
+        add_one(1)
+    with pytest.raises(ValueError, match="does not match"):
+        graph.run(resume_from=tmp_path)
+
+
+def test_resume_mutable_nodes(tmp_path):
+    graph, *_ = build_graph(immutable_nodes=False)
+    with pytest.raises(ValueError):
+        graph.run(resume_from=tmp_path)
+
+
+@pytest.mark.parametrize("deployment", DEPLOYMENTS)
+def test_resume_changed_parameters(request, deployment, tmp_path):
+    with znflow.DiGraph() as graph:
+        node = AddOne(inputs=1)
+        AddOne(inputs=node.outputs)
+    graph.run(checkpoint=tmp_path)
+
+    deployment = request.getfixturevalue(deployment)
+    with znflow.DiGraph(deployment=deployment) as graph:
+        node = AddOne(inputs=2)
+        AddOne(inputs=node.outputs)
+    with pytest.raises(ValueError, match="does not match"):
+        graph.run(resume_from=tmp_path)
+    assert node.outputs is None
+
+
+@pytest.mark.parametrize("deployment", DEPLOYMENTS)
+def test_resume_changed_connections(request, deployment, tmp_path):
+    with znflow.DiGraph() as graph:
+        first = AddOne(inputs=1)
+        second = AddOne(inputs=2)
+        add_one(first.outputs)
+    graph.run(checkpoint=tmp_path)
+
+    deployment = request.getfixturevalue(deployment)
+    with znflow.DiGraph(deployment=deployment) as graph:
+        first = AddOne(inputs=1)
+        second = AddOne(inputs=2)
+        result = add_one(second.outputs)
+    with pytest.raises(ValueError, match="does not match"):
+        graph.run(resume_from=tmp_path)
+    assert result.result is None
@@ -1,5 +1,10 @@
 import dataclasses
+import pickle
 import random
+import subprocess
+import sys
+import threading
+import time
 
 import pytest
 
@@ -28,7 +33,12 @@ def add_to_ComputeSum(instance: ComputeSum):
 
 @pytest.mark.parametrize(
     "deployment",
-    ["vanilla_deployment", "dask_deployment"],
+    [
+        "vanilla_deployment",
+        "dask_deployment",
+        "parallel_deployment",
+        "process_deployment",
+    ],
 )
 def test_single_nodify(request, deployment):
     deployment = request.getfixturevalue(deployment)
@@ -43,7 +53,12 @@ def test_single_nodify(request, deployment):
 
 @pytest.mark.parametrize(
     "deployment",
-    ["vanilla_deployment", "dask_deployment"],
+    [
+        "vanilla_deployment",
+        "dask_deployment",
+        "parallel_deployment",
+        "process_deployment",
+    ],
 )
 def test_single_Node(request, deployment):
     deployment = request.getfixturevalue(deployment)
@@ -57,7 +72,12 @@ def test_single_Node(request, deployment):
 
 @pytest.mark.parametrize(
     "deployment",
-    ["vanilla_deployment", "dask_deployment"],
+    [
+        "vanilla_deployment",
+        "dask_deployment",
+        "parallel_deployment",
+        "process_deployment",
+    ],
 )
 def test_multiple_nodify(request, deployment):
     deployment = request.getfixturevalue(deployment)
@@ -76,7 +96,12 @@ def test_multiple_nodify(request, deployment):
 
 @pytest.mark.parametrize(
     "deployment",
-    ["vanilla_deployment", "dask_deployment"],
+    [
+        "vanilla_deployment",
+        "dask_deployment",
+        "parallel_deployment",
+        "process_deployment",
+    ],
 )
 def test_multiple_Node(request, deployment):
     deployment = request.getfixturevalue(deployment)
@@ -95,7 +120,12 @@ def test_multiple_Node(request, deployment):
 
 @pytest.mark.parametrize(
     "deployment",
-    ["vanilla_deployment", "dask_deployment"],
+    [
+        "vanilla_deployment",
+        "dask_deployment",
+        "parallel_deployment",
+        "process_deployment",
+    ],
 )
 def test_multiple_nodify_and_Node(request, deployment):
     deployment = request.getfixturevalue(deployment)
@@ -128,7 +158,12 @@ def concatenate(forces):
 
 @pytest.mark.parametrize(
     "deployment",
-    ["vanilla_deployment", "dask_deployment"],
+    [
+        "vanilla_deployment",
+        "dask_deployment",
+        "parallel_deployment",
+        "process_deployment",
+    ],
 )
 def test_concatenate(request, deployment):
     deployment = request.getfixturevalue(deployment)
@@ -141,3 +176,408 @@ def test_concatenate(request, deployment):
 
     assert isinstance(forces.result, list)
     assert len(forces.result) == 30
+
+
+class Tracker:
+    """Track the maximum number of concurrently running nodes."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max = 0
+
+    def track(self):
+        with self.lock:
+            self.running += 1
+            self.max = max(self.max, self.running)
+        time.sleep(0.05)
+        with self.lock:
+            self.running -= 1
+
+
+@dataclasses.dataclass
+class TrackConcurrency(znflow.Node):
+    tracker: Tracker
+    outputs: int = None
+
+    def run(self):
+        self.tracker.track()
+        self.outputs = 1
+
+
+@dataclasses.dataclass
+class MemoryHungry(TrackConcurrency):
+    _resources_ = {"memory": "6GB"}
+
+
+def test_parallel_deployment_concurrency():
+    tracker = Tracker()
+    deployment = znflow.deployment.ParallelDeployment(resources={"cpus": 4})
+    with znflow.DiGraph(deployment=deployment) as graph:
+        nodes = [TrackConcurrency(tracker=tracker) for _ in range(8)]
+
+    graph.run()
+    assert all(node.outputs == 1 for node in nodes)
+    assert tracker.max == 4
+
+
+def test_parallel_deployment_memory():
+    tracker = Tracker()
+    deployment = znflow.deployment.ParallelDeployment(
+        resources={"cpus": 4, "memory": "16GB"}
+    )
+    with znflow.DiGraph(deployment=deployment) as graph:
+        nodes = [MemoryHungry(tracker=tracker) for _ in range(4)]
+
+    graph.run()
+    assert all(node.outputs == 1 for node in nodes)
+    assert tracker.max == 2
+
+
+def test_parallel_deployment_nodify_resources():
+    tracker = Tracker()
+
+    @znflow.nodify(resources={"cpus": 2})
+    def track(tracker):
+        tracker.track()
+
+    deployment = znflow.deployment.ParallelDeployment(resources={"cpus": 4})
+    with znflow.DiGraph(deployment=deployment) as graph:
+        for _ in range(4):
+            track(tracker)
+
+    graph.run()
+    assert tracker.max == 2
+
+
+def test_parallel_deployment_insufficient_resources():
+    deployment = znflow.deployment.ParallelDeployment(resources={"memory": "1GB"})
+    with znflow.DiGraph(deployment=deployment) as graph:
+        MemoryHungry(tracker=Tracker())
+
+    with pytest.raises(ValueError, match="requires memory"):
+        graph.run()
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("8GB", 8e9), ("512 MiB", 512 * 2**20), (1024, 1024), ("1.5kb", 1500)],
+)
+def test_parse_memory(value, expected):
+    assert znflow.deployment.parallel.parse_memory(value) == expected
+
+
+@znflow.nodify(timeout=0.2)
+def sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+@pytest.mark.parametrize(
+    "deployment",
+    ["dask_deployment", "parallel_deployment", "process_deployment"],
+)
+def test_timeout(request, deployment):
+    deployment = request.getfixturevalue(deployment)
+    with znflow.DiGraph(deployment=deployment) as graph:
+        sleep(2)
+
+    start = time.perf_counter()
+    with pytest.raises(znflow.exceptions.NodeTimeoutError, match="timeout of 0.2 s"):
+        graph.run()
+    assert time.perf_counter() - start < 2
+
+
+TIMEOUT_SCRIPT = """
+import znflow
+
+@znflow.nodify(timeout=0.2)
+def hang():
+    import time
+    time.sleep(60)
+
+with znflow.DiGraph(deployment=znflow.deployment.ParallelDeployment()) as graph:
+    hang()
+try:
+    graph.run()
+except znflow.exceptions.NodeTimeoutError:
+    print("timeout")
+"""
+
+
+def test_parallel_deployment_timeout_exit():
+    # the abandoned node must not keep the interpreter alive
+    result = subprocess.run(
+        [sys.executable, "-c", TIMEOUT_SCRIPT],
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+    assert result.stdout.strip() == "timeout"
+
+
+@znflow.nodify(timeout=0.2)
+def slow_sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def test_parallel_deployment_timeout_discarded():
+    with znflow.DiGraph(deployment=znflow.deployment.ParallelDeployment()) as graph:
+        result = slow_sleep(0.5)
+    with pytest.raises(znflow.exceptions.NodeTimeoutError):
+        graph.run()
+
+    # the abandoned attempt does not change the node
+    time.sleep(1)
+    assert result.result is None
+    assert not graph.nodes[result.uuid].get("available", False)
+    with pytest.raises(znflow.exceptions.NodeTimeoutError):
+        graph.run()
+
+
+ATTEMPTS = []
+
+
+@dataclasses.dataclass
+class Straggler(znflow.Node):
+    inputs: int
+    hang: bool = False
+    outputs: int = None
+    history: list = dataclasses.field(default_factory=list)
+
+    def run(self):
+        ATTEMPTS.append(self.inputs)
+        self.history.append(self.inputs)
+        # measurable runtimes, so scheduling jitter does not start duplicates
+        time.sleep(2 if self.hang and ATTEMPTS.count(self.inputs) == 1 else 0.05)
+        self.outputs = self.inputs + 1
+
+
+def test_parallel_deployment_straggler():
+    ATTEMPTS.clear()
+    deployment = znflow.deployment.ParallelDeployment(
+        resources={"cpus": 2}, straggler_factor=2.0, straggler_min_time=0.3
+    )
+    with znflow.DiGraph(deployment=deployment) as graph:
+        node = Straggler(inputs=0)
+        for _ in range(3):
+            node = Straggler(inputs=node.outputs)
+        straggler = Straggler(inputs=node.outputs, hang=True)
+
+    start = time.perf_counter()
+    graph.run()
+    assert time.perf_counter() - start < 1.5
+    assert straggler.outputs == 5
+    # only the hanging node was started a second time
+    assert ATTEMPTS == [0, 1, 2, 3, 4, 4]
+    # the attempts do not share their inputs
+    assert straggler.history == [4]
+
+
+def test_parallel_deployment_straggler_min_time():
+    deployment = znflow.deployment.ParallelDeployment(straggler_factor=2.0)
+    with znflow.DiGraph(deployment=deployment):
+        node = Straggler(inputs=0)
+    type_name = znflow.persistence.get_type_name(node)
+    assert deployment._get_straggler_time(node.uuid, {type_name: [1e-6] * 3}) == 1.0
+    assert deployment._get_straggler_time(node.uuid, {type_name: [2.0] * 3}) == 4.0
+    # too few samples to detect stragglers
+    assert deployment._get_straggler_time(node.uuid, {type_name: [2.0] * 2}) is None
+
+
+@dataclasses.dataclass
+class CreateList(znflow.Node):
+    inputs: list
+    outputs: list = None
+
+    def run(self):
+        self.outputs = list(self.inputs) + [len(self.inputs)] * 1000
+
+
+def test_dask_deployment_lightweight(dask_deployment):
+    with znflow.DiGraph(deployment=dask_deployment) as graph:
+        node = CreateList(inputs=list(range(1000)))
+        for _ in range(5):
+            node = CreateList(inputs=node.outputs)
+        first = compute_sum(node.outputs[1], node.outputs[-1])
+
+    detached, _ = dask_deployment._detach(node)
+    assert isinstance(detached.inputs.instance, znflow.base.NodePlaceholder)
+    assert detached.inputs.uuid == node.inputs.uuid
+    # the original node is not changed
+    assert isinstance(node.inputs.instance, CreateList)
+    # the upstream nodes are not serialized
+    assert 10 * len(pickle.dumps(detached)) < len(pickle.dumps(node))
+
+    graph.run()
+    assert len(node.outputs) == 7000
+    assert first.result == 6001
+
+
+@dataclasses.dataclass
+class LargeConfig(znflow.Node):
+    _outputs_ = ["outputs"]
+
+    config: dict
+    outputs: int = None
+
+    def run(self):
+        self.outputs = len(self.config)
+
+
+def test_dask_get_changes():
+    node = LargeConfig(config={idx: str(idx) for idx in range(1000)})
+    node = znflow.deployment.dask_depl.node_submit(node)
+    outputs, changes = znflow.deployment.dask_depl.get_changes(node)
+    assert outputs == ["outputs"]
+    assert changes == {"outputs": 1000}
+
+
+def test_dask_deployment_changed_outputs(dask_deployment):
+    with znflow.DiGraph(deployment=dask_deployment) as graph:
+        node = LargeConfig(config={"a": 1, "b": 2})
+        result = compute_sum(node.outputs, 1)
+    graph.run()
+
+    assert node.outputs == 2
+    assert node.config == {"a": 1, "b": 2}
+    assert result.result == 3
+
+
+@dataclasses.dataclass
+class ExtendOutputs(znflow.Node):
+    size: int
+    outputs: list = dataclasses.field(default_factory=list)
+
+    def run(self):
+        self.outputs.extend(range(self.size))
+
+
+@pytest.mark.parametrize(
+    "deployment", ["vanilla_deployment", "dask_deployment", "process_deployment"]
+)
+def test_in_place_outputs(request, deployment):
+    deployment = request.getfixturevalue(deployment)
+    with znflow.DiGraph(deployment=deployment) as graph:
+        node = ExtendOutputs(size=3)
+        result = compute_sum(node.outputs[1], 3)
+    graph.run()
+
+    assert node.outputs == [0, 1, 2]
+    assert result.result == 4
+
+
+@znflow.nodify
+def weighted_sum(data, weight):
+    return float(data.sum()) * weight
+
+
+@pytest.mark.parametrize("broadcast", [True, False])
+def test_dask_deployment_scatter(client, broadcast):
+    np = pytest.importorskip("numpy")
+    deployment = znflow.deployment.DaskDeployment(
+        client=client, scatter_threshold=1000, broadcast=broadcast
+    )
+    data = np.arange(1000, dtype=float)
+    small = np.arange(10, dtype=float)
+    with znflow.DiGraph(deployment=deployment) as graph:
+        results = [weighted_sum(data, weight) for weight in range(5)]
+        small_results = [weighted_sum(small, weight) for weight in range(2)]
+        node = LargeConfig(config={"data": data, "small": small})
+    graph.run()
+
+    assert [x.result for x in results] == [data.sum() * weight for weight in range(5)]
+    assert [x.result for x in small_results] == [0, small.sum()]
+    assert node.outputs == 2
+    # the large array is scattered once and shared by all nodes
+    assert len(deployment.scattered) == 1
+    # the nodes in the graph are not changed
+    assert results[0].args[0] is data
+
+
+def test_dask_deployment_scatter_disabled(client):
+    np = pytest.importorskip("numpy")
+    deployment = znflow.deployment.DaskDeployment(client=client, scatter_threshold=None)
+    data = np.arange(10**6, dtype=float)
+    with znflow.DiGraph(deployment=deployment) as graph:
+        result = weighted_sum(data, 2)
+    graph.run()
+    assert result.result == data.sum() * 2
+    assert deployment.scattered == {}
+
+
+def test_dask_deployment_pure(client):
+    def build(size):
+        deployment = znflow.deployment.DaskDeployment(client=client, pure=True)
+        with znflow.DiGraph(deployment=deployment) as graph:
+            node = CreateList(inputs=list(range(size)))
+            result = compute_sum(node.outputs[1], 10)
+        graph.run()
+        return deployment, node, result
+
+    deployment1, node1, result1 = build(3)
+    deployment2, node2, result2 = build(3)
+    deployment3, node3, result3 = build(4)
+
+    assert result1.result == result2.result == result3.result == 11
+    # identical nodes from rebuilt graphs share the same task
+    assert deployment1.results[node1.uuid].key == deployment2.results[node2.uuid].key
+    assert deployment1.results[result1.uuid].key == deployment2.results[result2.uuid].key
+    # different parameters or upstream nodes result in different tasks
+    assert deployment1.results[node1.uuid].key != deployment3.results[node3.uuid].key
+    assert deployment1.results[result1.uuid].key != deployment3.results[result3.uuid].key
+
+
+def make_add_offset(offset):
+    @znflow.nodify
+    def add_offset(value):
+        return value + offset
+
+    return add_offset
+
+
+def test_dask_deployment_pure_closures(client):
+    results = []
+    for offset in range(2):
+        deployment = znflow.deployment.DaskDeployment(client=client, pure=True)
+        with znflow.DiGraph(deployment=deployment) as graph:
+            # closures with the same qualified name, but different captured values
+            result = make_add_offset(offset)(1)
+        graph.run()
+        results.append(result.result)
+    assert results == [1, 2]
+
+
+def test_dask_deployment_pure_scattered(client):
+    np = pytest.importorskip("numpy")
+    keys = []
+    for _ in range(2):
+        deployment = znflow.deployment.DaskDeployment(
+            client=client, pure=True, scatter_threshold=1000
+        )
+        with znflow.DiGraph(deployment=deployment) as graph:
+            result = weighted_sum(np.arange(1000, dtype=float), 2)
+        graph.run()
+        assert result.result == np.arange(1000).sum() * 2
+        assert len(deployment.scattered) == 1
+        keys.append(deployment.results[result.uuid].key)
+    assert keys[0] == keys[1]
+
+
+def test_dask_deployment_load_order(dask_deployment):
+    graph = znflow.DiGraph(deployment=dask_deployment)
+    a = ComputeSum(inputs=[1, 2])
+    b = ComputeSum(inputs=[a @ "outputs", 1])
+    # 'b' is inserted into the graph before its predecessor 'a'
+    graph.write_graph(b, a)
+    graph.run()
+    assert a.outputs == 3
+    assert b.inputs == [3, 1]
+    assert b.outputs == 4
+
+    finished = []
+    dask_deployment._node_finished = finished.append
+    graph.run()
+    # results of previous runs are not loaded again
+    assert finished == []
@@ -18,7 +18,7 @@ class AddOne(znflow.Node):
 
 @pytest.mark.parametrize(
     "deployment",
-    ["vanilla_deployment", "dask_deployment"],
+    ["vanilla_deployment", "dask_deployment", "parallel_deployment"],
 )
 def test_break_loop(request, deployment):
     """Test loop breaking when output exceeds 5."""
@@ -43,7 +43,7 @@ def test_break_loop(request, deployment):
 
 @pytest.mark.parametrize(
     "deployment",
-    ["vanilla_deployment", "dask_deployment"],
+    ["vanilla_deployment", "dask_deployment", "parallel_deployment"],
 )
 def test_break_loop_multiple(request, deployment):
     """Test loop breaking with multiple nodes and different conditions."""
@@ -82,7 +82,7 @@ def test_break_loop_multiple(request, deployment):
 
 @pytest.mark.parametrize(
     "deployment",
-    ["vanilla_deployment", "dask_deployment"],
+    ["vanilla_deployment", "dask_deployment", "parallel_deployment"],
 )
 def test_resolvce_only_run_relevant_nodes(request, deployment):
     """Test that when using resolve only nodes that are direct predecessors are run."""
@@ -110,7 +110,7 @@ def test_resolvce_only_run_relevant_nodes(request, deployment):
 
 @pytest.mark.parametrize(
     "deployment",
-    ["vanilla_deployment", "dask_deployment"],
+    ["vanilla_deployment", "dask_deployment", "parallel_deployment"],
 )
 def test_connections_remain(request, deployment):
     deployment = request.getfixturevalue(deployment)
@@ -124,7 +124,7 @@ def test_connections_remain(request, deployment):
 
 @pytest.mark.parametrize(
     "deployment",
-    ["vanilla_deployment", "dask_deployment"],
+    ["vanilla_deployment", "dask_deployment", "parallel_deployment"],
 )
 def test_loop_over_results(request, deployment):
     deployment = request.getfixturevalue(deployment)
@@ -138,3 +138,83 @@ def test_loop_over_results(request, deployment):
     graph.run()
     assert len(nodes) == 6
     assert [node.outputs for node in nodes] == [1, 2, 3, 4, 5, 6]
+
+
+@pytest.mark.parametrize(
+    "deployment",
+    ["vanilla_deployment", "dask_deployment", "parallel_deployment"],
+)
+def test_resolve_many(request, deployment, monkeypatch):
+    """Test resolving multiple connections with a single run."""
+    deployment = request.getfixturevalue(deployment)
+    graph = znflow.DiGraph(deployment=deployment)
+    runs = []
+    run = graph.run
+    monkeypatch.setattr(graph, "run", lambda nodes: runs.append(nodes) or run(nodes))
+
+    with graph:
+        node1 = AddOne(inputs=1)
+        node2 = AddOne(inputs=node1.outputs)
+        node3 = AddOne(inputs=10)
+        values = znflow.resolve_many(node2.outputs, node3.outputs, node2.outputs, 42)
+
+    assert values == [3, 11, 3, 42]
+    assert len(runs) == 1
+    assert len(runs[0]) == 2
+    # all values are available, nothing is run again
+    assert znflow.resolve_many(node1.outputs, node2.outputs) == [2, 3]
+    assert len(runs) == 1
+
+
+@pytest.mark.parametrize(
+    "deployment",
+    ["vanilla_deployment", "dask_deployment", "parallel_deployment"],
+)
+def test_resolve_async(request, deployment):
+    """Test building the graph while a value is resolved in the background."""
+    deployment = request.getfixturevalue(deployment)
+    graph = znflow.DiGraph(deployment=deployment)
+    with graph:
+        node1 = AddOne(inputs=1)
+        node2 = AddOne(inputs=node1.outputs)
+        handle = znflow.resolve_async(node2.outputs)
+        # overlaps with the background run, but must not run 'node1' twice
+        other = znflow.resolve_async(AddOne(inputs=node1.outputs).outputs)
+        node3 = AddOne(inputs=node2.outputs)
+
+        assert handle.result() == 3
+        assert other.result() == 3
+
+    graph.run()
+    assert node3.outputs == 4
+    assert not graph._running
+
+
+def test_resolve_async_speculative():
+    graph = znflow.DiGraph()
+    with graph:
+        node1 = AddOne(inputs=1)
+        node2 = AddOne(inputs=10)
+        handle = znflow.resolve_async(node1.outputs, speculative=True)
+        assert handle.result() == 2
+        graph.wait()
+        # 'node2' was run speculatively
+        assert graph.nodes[node2.uuid]["available"]
+
+    graph.run()
+    assert node2.outputs == 11
+
+
+def test_resolve_async_exception():
+    @znflow.nodify
+    def fail():
+        raise ValueError("failed in the background")
+
+    with znflow.DiGraph():
+        handle = znflow.resolve_async(fail())
+        with pytest.raises(ValueError, match="failed in the background"):
+            handle.result()
+
+
+def test_resolve_async_value():
+    assert znflow.resolve_async(42).result() == 42
@@ -1,3 +1,5 @@
+import inspect
+
 import pytest
 
 import znflow
@@ -28,3 +30,21 @@ def test_add_args(args, kwargs):
     with pytest.raises(TypeError):
         with znflow.DiGraph():
             add(*args, **kwargs)
+
+
+def test_signature_cached(monkeypatch):
+    @znflow.nodify
+    def add(a, b=1):
+        return a + b
+
+    calls = []
+    signature = inspect.signature
+    monkeypatch.setattr(
+        inspect, "signature", lambda func: calls.append(func) or signature(func)
+    )
+    with znflow.DiGraph():
+        add(1)
+        add(1, b=2)
+        with pytest.raises(TypeError):
+            add(1, c=2)
+    assert len(calls) == 1
@@ -1,4 +1,8 @@
+import asyncio
+import copy
 import dataclasses
+import pickle
+import threading
 
 import pytest
 import zninit
@@ -74,8 +78,8 @@ def test_changed_graph():
     """Test changed DiGraph."""
     with pytest.raises(ValueError):
         with znflow.DiGraph():
-            znflow.base.NodeBaseMixin._graph_ = znflow.DiGraph()
-    znflow.base.NodeBaseMixin._graph_ = znflow.empty_graph  # reset after test
+            znflow.base.set_graph(znflow.DiGraph())
+    znflow.base.set_graph(znflow.empty_graph)  # reset after test
 
 
 def test_add_others():
@@ -185,3 +189,79 @@ def test_node_not_on_graph():
         with znflow.DiGraph():
             with pytest.raises(ValueError):
                 _ = DataclassNode(value=node1.value)
+
+
+def test_graph_per_thread():
+    """Each thread has its own active graph."""
+    barrier = threading.Barrier(2)
+    graphs = {}
+
+    def build(value):
+        with znflow.DiGraph() as graph:
+            barrier.wait()
+            node = DataclassNode(value=value)
+            assert node._graph_ is graph
+            barrier.wait()
+        graphs[value] = (graph, node)
+
+    threads = [threading.Thread(target=build, args=(idx,)) for idx in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert znflow.get_graph() is znflow.empty_graph
+    for value, (graph, node) in graphs.items():
+        assert list(graph.nodes) == [node.uuid]
+        graph.run()
+        assert node.value == value + 1
+
+
+def test_disable_graph_in_thread():
+    """'disable_graph' in another thread does not affect the active graph."""
+    with znflow.DiGraph() as graph:
+
+        def worker():
+            with znflow.disable_graph():
+                assert znflow.get_graph() is znflow.empty_graph
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        assert znflow.get_graph() is graph
+
+
+def test_graph_per_task():
+    """Each asyncio task has its own active graph."""
+
+    async def build(value):
+        with znflow.DiGraph() as graph:
+            await asyncio.sleep(0)
+            node = DataclassNode(value=value)
+            await asyncio.sleep(0)
+        return graph, node
+
+    async def main():
+        return await asyncio.gather(build(1), build(2))
+
+    for graph, node in asyncio.run(main()):
+        assert list(graph.nodes) == [node.uuid]
+
+
+@pytest.mark.parametrize("dump", [pickle.dumps, copy.deepcopy])
+def test_copy_executed_graph(dump):
+    with znflow.DiGraph() as graph:
+        node = DataclassNode(value=1)
+        result = ComputeSum(node, node)
+    graph.run_async().result()
+
+    copied = dump(graph)
+    if isinstance(copied, bytes):
+        copied = pickle.loads(copied)
+    assert set(copied.nodes) == set(graph.nodes)
+    assert copied.nodes[node.uuid]["value"].value == 2
+    assert copied.nodes[result.uuid]["value"].result == 4
+    # background runs are not shared with the copy
+    assert copied._running == {}
+    copied.run_async().result()
+    copied.wait()
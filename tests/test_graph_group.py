@@ -1,3 +1,5 @@
+import dataclasses
+
 import pytest
 
 import znflow
@@ -11,6 +13,15 @@ class PlainNode(znflow.Node):
         self.value += 1
 
 
+@dataclasses.dataclass
+class AddOne(znflow.Node):
+    inputs: int
+    outputs: int = None
+
+    def run(self):
+        self.outputs = self.inputs + 1
+
+
 def test_empty_grp_name():
     graph = znflow.DiGraph()
 
@@ -297,3 +308,64 @@ def test_empty_grps():
     assert len(graph.groups) == 2
     assert grp1.names in graph.groups
     assert grp2.names in graph.groups
+
+
+def test_grp_membership_is_incremental():
+    with znflow.DiGraph() as graph:
+        nodes = [PlainNode(idx) for idx in range(100)]
+        with graph.group("grp1") as grp1:
+            n1 = PlainNode(1)
+        with graph.group("grp2") as grp2:
+            n2 = PlainNode(2)
+        with graph.group("grp1"):
+            n3 = PlainNode(3)
+
+    assert grp1.uuids == [n1.uuid, n3.uuid]
+    assert grp2.uuids == [n2.uuid]
+    assert all(node.uuid not in grp1 for node in nodes)
+    assert n2.uuid not in grp1
+
+
+def test_grp_add_nodes_bulk():
+    existing = PlainNode(0)
+    graph = znflow.DiGraph()
+    graph.add_nodes_bulk([existing])
+
+    n1, n2 = PlainNode(1), PlainNode(2)
+    with graph.group("grp1") as grp:
+        graph.add_nodes_bulk([existing, n1, n2])
+
+    assert grp.uuids == [n1.uuid, n2.uuid]
+    assert existing.uuid not in grp
+
+
+@pytest.mark.parametrize(
+    "deployment", ["vanilla_deployment", "dask_deployment", "parallel_deployment"]
+)
+@pytest.mark.parametrize("as_name", [True, False])
+def test_run_groups(request, deployment, as_name):
+    deployment = request.getfixturevalue(deployment)
+    graph = znflow.DiGraph(deployment=deployment)
+
+    with graph.group("grp1") as grp1:
+        n1 = AddOne(inputs=1)
+    with graph.group("grp2") as grp2:
+        n2 = AddOne(inputs=n1.outputs)
+    with graph.group("grp3") as grp3:
+        n3 = AddOne(inputs=10)
+    with graph.group("grp", "4") as grp4:
+        n4 = AddOne(inputs=20)
+
+    if as_name:
+        graph.run(groups=["grp2", ("grp", "4")])
+    else:
+        graph.run(groups=[grp2, grp4])
+
+    # grp1 is run because grp2 depends on it.
+    assert n1.outputs == 2
+    assert n2.outputs == 3
+    assert n3.outputs is None
+    assert n4.outputs == 21
+
+    graph.run(groups=[grp1, grp3])
+    assert n3.outputs == 11
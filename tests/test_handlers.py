@@ -1,3 +1,5 @@
+import uuid
+
 import pytest
 
 import znflow
@@ -42,3 +44,22 @@ def test_UpdateConnectors(value, expected):
         future.run()
     with znflow.DiGraph():
         assert handler.UpdateConnectors()(value) == expected
+
+
+def test_ConnectArguments():
+    with znflow.DiGraph() as graph:
+        source = znflow.nodify(lambda: 1)()
+        target = znflow.FunctionFuture(function=lambda *x: x, args=(), kwargs={})
+        target.uuid = uuid.uuid4()
+        graph.add_znflow_node(target)
+        args, kwargs = handler.ConnectArguments()(
+            ((1, source), {"x": [source[0]]}),
+            graph=graph,
+            node_instance=target,
+        )
+
+    assert args[0] == 1
+    assert isinstance(args[1], znflow.Connection)
+    assert args[1].instance is source
+    assert kwargs["x"][0].item == 0
+    assert graph.number_of_edges(source.uuid, target.uuid) == 2
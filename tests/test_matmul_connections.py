@@ -1,4 +1,7 @@
 import dataclasses
+import uuid
+
+import pytest
 
 import znflow
 
@@ -41,3 +44,60 @@ def test_connect_nodes():
     graph.run()
     assert node1.outputs == 50
     assert len(graph) == 2
+
+
+def test_write_graph_bulk():
+    nodes = [Node(inputs=1)]
+    for _ in range(10):
+        nodes.append(Node(inputs=nodes[-1] @ "outputs"))
+
+    graph = znflow.DiGraph()
+    graph.write_graph(nodes, bulk=True)
+
+    assert len(graph) == 11
+    assert graph.number_of_edges() == 10
+    edge: dict = graph.get_edge_data(nodes[0].uuid, nodes[1].uuid)
+    assert edge[0]["v_attr"] == "inputs"
+    assert edge[0]["u_attr"] == "outputs"
+
+    graph.run()
+    assert nodes[-1].outputs == 2**11
+
+
+def test_write_graph_bulk_idempotent():
+    nodes = [Node(inputs=1)]
+    nodes.append(Node(inputs=nodes[-1] @ "outputs"))
+    future = znflow.FunctionFuture(
+        function=lambda x: x + 1, args=(nodes[0] @ "outputs",), kwargs={}
+    )
+    future.uuid = uuid.uuid4()
+
+    graph = znflow.DiGraph()
+    graph.write_graph(nodes, future, bulk=True)
+    assert graph.number_of_edges() == 2
+    graph.write_graph(nodes, future, nodes, bulk=True)
+    assert len(graph) == 3
+    assert graph.number_of_edges() == 2
+
+    graph.run()
+    assert nodes[-1].outputs == 4
+    assert future.result == 3
+
+
+def test_add_nodes_bulk_function_future():
+    node = Node(inputs=3)
+    future = znflow.FunctionFuture(function=lambda x: x + 1, args=(node,), kwargs={})
+    future.uuid = uuid.uuid4()
+
+    graph = znflow.DiGraph()
+    graph.add_nodes_bulk([node, future])
+
+    assert isinstance(future.args[0], znflow.Connection)
+    assert graph.number_of_edges() == 1
+    assert list(graph.successors(node.uuid)) == [future.uuid]
+
+
+def test_add_nodes_bulk_error():
+    graph = znflow.DiGraph()
+    with pytest.raises(ValueError):
+        graph.add_nodes_bulk([42])
@@ -1,3 +1,4 @@
+import copy
 import dataclasses
 
 import attrs
@@ -370,3 +371,109 @@ def test_ListConnection(deployment, request):
     assert isinstance(edge2, dict)
     assert edge2[0]["u_attr"] == "value"
     assert edge2[0]["v_attr"] == "nodes"
+
+
+@pytest.mark.parametrize(
+    "cls", [PlainNode, DataclassNode, ZnInitNode, AttrsNode, PydanticNode]
+)
+def test_interned_connections(cls):
+    with znflow.DiGraph() as graph:
+        node = cls(value=42)
+        connection = node.value
+        assert isinstance(connection, znflow.Connection)
+        assert node.value is connection
+        assert node.value[0] is connection[0]
+        future = add(connection)
+        assert future[1] is future[1]
+    assert node.value == 42
+    assert len(graph._connections) == 3
+
+
+def test_interned_items_by_type():
+    with znflow.DiGraph():
+        node = DataclassNode(value=[1, 2])
+        future = add(node.value)
+        # equal dictionary keys of different types are different items
+        for item in [1, True, 0, False, 0.0]:
+            assert type(node.value[item].item) is type(item)
+            assert type(future[item].item) is type(item)
+            assert node.value[item] is node.value[item]
+
+
+def test_connection_slots():
+    with znflow.DiGraph():
+        node = DataclassNode(value=42)
+        connection = node.value
+        combined = add(1) + add(2)
+    assert not hasattr(connection, "__dict__")
+    assert not hasattr(combined, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        connection.item = 1
+
+
+@pytest.mark.parametrize(
+    "cls", [PlainNode, DataclassNode, ZnInitNode, AttrsNode, PydanticNode]
+)
+def test_prepare_class_once(cls):
+    with znflow.DiGraph() as graph:
+        first = cls(value=1)
+        init = cls.__init__
+        nodes = [cls(value=idx) for idx in range(10)]
+        assert cls.__init__ is init
+
+    assert "_znflow_class_" in cls.__dict__
+    assert len({node.uuid for node in [first, *nodes]}) == 11
+    assert all(node.uuid in graph for node in [first, *nodes])
+    assert not first._in_construction
+
+
+def test_native_attribute_access():
+    assert "__getattribute__" not in znflow.Node.__dict__
+    with znflow.DiGraph():
+        assert "__getattribute__" in znflow.Node.__dict__
+        node = PlainNode(value=42)
+        assert isinstance(node.value, znflow.Connection)
+    assert "__getattribute__" not in znflow.Node.__dict__
+    assert "__setattr__" not in znflow.Node.__dict__
+    assert node.value == 42
+
+
+def test_native_attribute_access_restored():
+    """Outside a graph, nodes use the attribute access of plain objects."""
+    with znflow.DiGraph():
+        node = PlainNode(value=42)
+        with znflow.disable_graph():
+            assert node.value == 42
+        # disabling the graph does not restore the native access too early
+        assert isinstance(node.value, znflow.Connection)
+    assert PlainNode.__getattribute__ is object.__getattribute__
+    assert PlainNode.__setattr__ is object.__setattr__
+
+    with pytest.raises(ValueError), znflow.DiGraph():
+        raise ValueError
+    assert PlainNode.__getattribute__ is object.__getattribute__
+    assert PlainNode.__setattr__ is object.__setattr__
+
+
+class ValidatedNode(pydantic.BaseModel, znflow.Node):
+    value: int
+
+    def run(self):
+        self.value += 1
+
+
+def test_pydantic_uuid_not_reused():
+    """Nodes never pick up the uuid of a node that did not finish '__init__'."""
+    with znflow.DiGraph() as graph:
+        with znflow.disable_graph():
+            with pytest.raises(pydantic.ValidationError):
+                ValidatedNode(value="not an int")
+        node = ValidatedNode(value=1)
+        with znflow.disable_graph():
+            node_copy = copy.copy(node)  # does not call '__init__'
+        nodes = [DataclassNode(value=1), PlainNode(value=2), ValidatedNode(value=3)]
+
+    assert node_copy.uuid == node.uuid
+    assert all(x.uuid in graph for x in [node, *nodes])
+    assert len({x.uuid for x in [node, *nodes]}) == 4
+    assert "_znflow_uuid_" not in vars(node)
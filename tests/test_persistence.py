@@ -0,0 +1,87 @@
+"""Test saving and loading a 'znflow.DiGraph'."""
+
+import dataclasses
+
+import pytest
+
+import znflow
+
+np = pytest.importorskip("numpy")
+
+
+@dataclasses.dataclass
+class Linspace(znflow.Node):
+    size: int
+    outputs: np.ndarray = None
+
+    def run(self):
+        self.outputs = np.linspace(0, 1, self.size)
+
+
+@znflow.nodify
+def scale(values, factor):
+    return values * factor
+
+
+def test_save_load(tmp_path):
+    graph = znflow.DiGraph()
+    with graph.group("grp"):
+        small = Linspace(size=10)
+        large = Linspace(size=100_000)
+    with graph:
+        result = scale(large.outputs, factor=2)
+        small_result = scale(small.outputs, factor=3)
+    graph.run()
+
+    graph.save(tmp_path, array_threshold=1024)
+    assert len(list((tmp_path / "arrays").glob("*.npy"))) == 2
+
+    loaded = znflow.DiGraph.load(tmp_path)
+    assert set(loaded.nodes) == set(graph.nodes)
+    assert set(loaded.edges) == set(graph.edges)
+    assert loaded.get_group("grp").uuids == [small.uuid, large.uuid]
+    assert all(loaded.nodes[x]["available"] for x in loaded)
+
+    loaded_large = loaded.nodes[large.uuid]["value"]
+    loaded_result = loaded.nodes[result.uuid]["value"]
+    assert isinstance(loaded_large.outputs, np.memmap)
+    assert isinstance(loaded_result.result, np.memmap)
+    assert not isinstance(loaded.nodes[small.uuid]["value"].outputs, np.memmap)
+    np.testing.assert_array_equal(loaded_large.outputs, large.outputs)
+    np.testing.assert_array_equal(loaded_result.result, result.result)
+    np.testing.assert_array_equal(
+        loaded.nodes[small_result.uuid]["value"].result, small_result.result
+    )
+    # shared arrays are loaded only once
+    assert loaded_result.args[0] is loaded_large.outputs
+
+
+def test_save_loaded_graph(tmp_path):
+    with znflow.DiGraph() as graph:
+        node = Linspace(size=100_000)
+    graph.run()
+    graph.save(tmp_path)
+
+    loaded = znflow.DiGraph.load(tmp_path)
+    loaded_node = loaded.nodes[node.uuid]["value"]
+    loaded_node.outputs[0] = 42  # copy-on-write
+    loaded.save(tmp_path)
+
+    assert len(list((tmp_path / "arrays").glob("*.npy"))) == 1
+    reloaded = znflow.DiGraph.load(tmp_path)
+    assert reloaded.nodes[node.uuid]["value"].outputs[0] == 42
+    assert loaded_node.outputs[1] == node.outputs[1]
+
+
+def test_run_loaded_graph(tmp_path):
+    with znflow.DiGraph() as graph:
+        node = Linspace(size=10)
+        result = scale(node.outputs, factor=2)
+    graph.save(tmp_path)
+
+    loaded = znflow.DiGraph.load(tmp_path, immutable_nodes=False)
+    assert loaded.immutable_nodes is False
+    loaded.run()
+    np.testing.assert_array_equal(
+        loaded.nodes[result.uuid]["value"].result, np.linspace(0, 2, 10)
+    )
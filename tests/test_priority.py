@@ -0,0 +1,82 @@
+"""Test the critical path based scheduling."""
+
+import dataclasses
+
+import pytest
+
+import znflow
+
+
+@dataclasses.dataclass
+class AddOne(znflow.Node):
+    inputs: int
+    outputs: int = None
+
+    def run(self):
+        self.outputs = self.inputs + 1
+
+
+@dataclasses.dataclass
+class ExpensiveAddOne(AddOne):
+    _cost_ = 100
+
+
+@znflow.nodify(cost=50)
+def add_one(value):
+    return value + 1
+
+
+def test_critical_path_lengths():
+    with znflow.DiGraph() as graph:
+        leaf = AddOne(inputs=1)
+        chain = AddOne(inputs=1)
+        for _ in range(3):
+            chain = AddOne(inputs=chain.outputs)
+        expensive = ExpensiveAddOne(inputs=1)
+        future = add_one(1)
+
+    lengths = graph.get_critical_path_lengths()
+    assert lengths[leaf.uuid] == 1
+    assert lengths[chain.uuid] == 1
+    assert lengths[graph.get_prioritized_nodes()[0]] == 100
+    assert lengths[expensive.uuid] == 100
+    assert lengths[future.uuid] == 50
+    assert max(lengths.values()) == 100
+
+
+def test_prioritized_nodes():
+    with znflow.DiGraph() as graph:
+        leafs = [AddOne(inputs=idx) for idx in range(10)]
+        chain = [AddOne(inputs=1)]
+        for _ in range(5):
+            chain.append(AddOne(inputs=chain[-1].outputs))
+
+    nodes = graph.get_prioritized_nodes()
+    # the long chain is scheduled before the leafs of equal or lower length
+    assert nodes[:5] == [node.uuid for node in chain[:5]]
+    assert set(nodes[5:]) == {node.uuid for node in leafs + chain[5:]}
+
+
+def test_observed_runtime():
+    with znflow.DiGraph() as graph:
+        node = AddOne(inputs=1)
+
+    graph.run()
+    runtime = graph.nodes[node.uuid]["runtime"]
+    assert runtime > 0
+    assert graph.get_critical_path_lengths()[node.uuid] == runtime
+
+
+@pytest.mark.parametrize(
+    "deployment", ["vanilla_deployment", "dask_deployment", "parallel_deployment"]
+)
+def test_run_prioritized(request, deployment):
+    deployment = request.getfixturevalue(deployment)
+    with znflow.DiGraph(deployment=deployment) as graph:
+        leafs = [AddOne(inputs=idx) for idx in range(10)]
+        node = ExpensiveAddOne(inputs=1)
+        node = add_one(node.outputs)
+
+    graph.run()
+    assert [leaf.outputs for leaf in leafs] == list(range(1, 11))
+    assert node.result == 3
@@ -0,0 +1,90 @@
+"""Test transferring NumPy arrays through shared memory."""
+
+import dataclasses
+import gc
+
+import pytest
+
+import znflow
+from znflow import shared_memory
+
+np = pytest.importorskip("numpy")
+
+
+@dataclasses.dataclass
+class Ones(znflow.Node):
+    size: int
+    outputs: np.ndarray = None
+
+    def run(self):
+        self.outputs = np.ones(self.size)
+
+
+@dataclasses.dataclass
+class Scale(znflow.Node):
+    inputs: np.ndarray
+    factor: float
+    outputs: np.ndarray = None
+
+    def run(self):
+        self.outputs = self.inputs * self.factor
+
+
+@znflow.nodify
+def total(values):
+    return float(values.sum())
+
+
+def test_registry_roundtrip():
+    owner = shared_memory.SharedMemoryRegistry(owner=True)
+    array = np.arange(100, dtype=float)
+    data, keepalive = shared_memory.dumps({"a": array, "b": array}, owner, threshold=1)
+    assert len(owner) == 1
+
+    loaded = shared_memory.loads(data, owner)
+    np.testing.assert_array_equal(loaded["a"], array)
+    assert loaded["a"] is loaded["b"]
+    assert len(owner) == 1
+
+    # exporting an array that is already in shared memory does not copy it
+    data, keepalive_slice = shared_memory.dumps(loaded["a"][10:], owner, threshold=1)
+    assert len(owner) == 1
+    np.testing.assert_array_equal(shared_memory.loads(data, owner), array[10:])
+
+    del loaded, keepalive, keepalive_slice, data
+    gc.collect()
+    assert len(owner) == 0
+
+
+def test_registry_small_arrays():
+    owner = shared_memory.SharedMemoryRegistry(owner=True)
+    data, keepalive = shared_memory.dumps(np.arange(10), owner, threshold=1024)
+    assert len(owner) == 0
+    assert keepalive == []
+    np.testing.assert_array_equal(shared_memory.loads(data, owner), np.arange(10))
+
+
+def test_process_deployment():
+    deployment = znflow.deployment.ParallelDeployment(
+        resources={"cpus": 2}, processes=True, shared_memory_threshold=1024
+    )
+    with znflow.DiGraph(deployment=deployment) as graph:
+        ones = Ones(size=10_000)
+        scaled = Scale(inputs=ones.outputs, factor=3)
+        result = total(scaled.outputs)
+        small = Scale(inputs=np.ones(3), factor=2)
+
+    graph.run()
+    registry = znflow.deployment.parallel._get_registry(owner=True)
+    assert len(registry) > 0
+    assert registry.get_handle(ones.outputs) is not None
+    assert registry.get_handle(scaled.outputs) is not None
+    np.testing.assert_array_equal(scaled.outputs, np.full(10_000, 3.0))
+    assert result.result == 30_000
+    np.testing.assert_array_equal(small.outputs, np.full(3, 2.0))
+    assert graph.nodes[scaled.uuid]["runtime"] > 0
+
+    # the deployment holds a reference to the graph
+    del deployment, graph, ones, scaled, result, small
+    gc.collect()
+    assert len(registry) == 0
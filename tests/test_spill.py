@@ -0,0 +1,111 @@
+"""Test spilling large node outputs to disk."""
+
+import dataclasses
+import gc
+
+import pytest
+
+import znflow
+
+np = pytest.importorskip("numpy")
+npt = np.testing
+
+
+@dataclasses.dataclass
+class CreateArray(znflow.Node):
+    size: int
+    outputs: np.ndarray = None
+
+    def run(self):
+        self.outputs = np.arange(self.size, dtype=np.float64)
+
+
+@dataclasses.dataclass
+class SumArray(znflow.Node):
+    inputs: np.ndarray
+    outputs: float = None
+
+    def run(self):
+        self.outputs = float(np.sum(self.inputs))
+
+
+@znflow.nodify
+def create_bytes(size):
+    return b"x" * size
+
+
+def test_spill_store(tmp_path):
+    store = znflow.spill.SpillStore(threshold=100, directory=tmp_path)
+    array = store.spill(np.ones(100))
+    assert isinstance(array, np.memmap)
+    npt.assert_array_equal(array, np.ones(100))
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # small arrays and other values are not spilled
+    small = np.ones(2)
+    assert store.spill(small) is small
+    data = b"a" * 100
+    assert store.spill(data) is data
+
+    del array
+    gc.collect()
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    "deployment", ["vanilla_deployment", "parallel_deployment", "process_deployment"]
+)
+def test_spill_outputs(tmp_path, deployment, request):
+    deployment = request.getfixturevalue(deployment)
+    with znflow.DiGraph(
+        deployment=deployment, spill_threshold=1000, spill_directory=tmp_path
+    ) as graph:
+        large = CreateArray(size=1000)
+        small = CreateArray(size=10)
+        total = SumArray(inputs=large.outputs)
+        data = create_bytes(1000)
+    graph.run()
+
+    assert isinstance(large.outputs, np.memmap)
+    assert not isinstance(small.outputs, np.memmap)
+    npt.assert_array_equal(large.outputs, np.arange(1000))
+    assert total.outputs == sum(range(1000))
+    assert data.result == b"x" * 1000
+    assert isinstance(data.result, bytes)
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+@pytest.mark.parametrize(
+    "deployment", ["vanilla_deployment", "parallel_deployment", "process_deployment"]
+)
+def test_spill_inputs_unchanged(tmp_path, deployment, request):
+    deployment = request.getfixturevalue(deployment)
+    inputs = np.ones(1000)
+    with znflow.DiGraph(
+        deployment=deployment, spill_threshold=1000, spill_directory=tmp_path
+    ) as graph:
+        node = SumArray(inputs=inputs)
+    graph.run()
+
+    assert node.outputs == 1000
+    assert not isinstance(node.inputs, np.memmap)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spill_cleanup(tmp_path):
+    with znflow.DiGraph(spill_threshold=1000, spill_directory=tmp_path) as graph:
+        node = CreateArray(size=1000)
+    graph.run()
+    assert len(list(tmp_path.iterdir())) == 1
+
+    node.outputs = None
+    gc.collect()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spill_disabled():
+    with znflow.DiGraph() as graph:
+        node = CreateArray(size=1000)
+    graph.run()
+    assert graph.spill_store is None
+    assert not isinstance(node.outputs, np.memmap)
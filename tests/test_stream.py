@@ -0,0 +1,195 @@
+"""Test streaming the items of generator nodes."""
+
+import dataclasses
+import threading
+import time
+
+import pytest
+
+import znflow
+
+PRODUCED = []
+CONSUMED = []
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    PRODUCED.clear()
+    CONSUMED.clear()
+
+
+@znflow.nodify
+def produce(size):
+    for idx in range(size):
+        PRODUCED.append(idx)
+        yield idx
+
+
+@znflow.nodify(streaming=True)
+def double(items):
+    for item in items:
+        yield 2 * item
+
+
+@znflow.nodify(streaming=True, buffer_size=2)
+def consume(items):
+    total = 0
+    for item in items:
+        CONSUMED.append((item, len(PRODUCED)))
+        total += item
+    return total
+
+
+@znflow.nodify
+def collect(items):
+    return items
+
+
+@dataclasses.dataclass
+class ProduceNode(znflow.Node):
+    size: int
+
+    def run(self):
+        yield from range(self.size)
+
+
+@dataclasses.dataclass
+class ConsumeNode(znflow.Node):
+    _streaming_ = True
+
+    items: list
+    outputs: int = None
+
+    def run(self):
+        self.outputs = sum(self.items)
+
+
+@pytest.mark.parametrize("deployment", ["vanilla_deployment", "parallel_deployment"])
+def test_stream(deployment, request):
+    deployment = request.getfixturevalue(deployment)
+    with znflow.DiGraph(deployment=deployment) as graph:
+        items = produce(100)
+        total = consume(double(items))
+        materialized = collect(items)
+    graph.run()
+
+    assert total.result == 2 * sum(range(100))
+    assert materialized.result == list(range(100))
+    assert isinstance(items.result, znflow.stream.Stream)
+
+
+def test_backpressure():
+    with znflow.DiGraph() as graph:
+        total = consume(produce(100))
+    graph.run()
+
+    assert total.result == sum(range(100))
+    # the producer is never more than the buffer size ahead of the consumer
+    for item, produced in CONSUMED:
+        assert produced - item <= 2 + 2
+
+
+def test_stream_node():
+    with znflow.DiGraph() as graph:
+        producer = ProduceNode(size=10)
+        consumer = ConsumeNode(items=producer)
+    graph.run()
+
+    assert consumer.outputs == sum(range(10))
+    assert "stream" in graph.nodes[producer.uuid]
+
+
+def test_stream_item():
+    with znflow.DiGraph() as graph:
+        items = produce(10)
+        first = collect(items[1])
+    graph.run()
+
+    assert first.result == 1
+
+
+def test_stream_exception():
+    @znflow.nodify
+    def fail():
+        yield 1
+        raise ValueError("producer failed")
+
+    with znflow.DiGraph() as graph:
+        total = consume(fail())
+
+    with pytest.raises(ValueError, match="producer failed"):
+        graph.run()
+    assert total.result is None
+
+
+def test_unconsumed_stream():
+    with znflow.DiGraph() as graph:
+        items = produce(5)
+    graph.run()
+    # the generator did not run, because nobody consumed it
+    assert PRODUCED == []
+    assert list(items.result) == list(range(5))
+    with pytest.raises(RuntimeError, match="already started"):
+        items.result.subscribe()
+
+
+def test_pipelined():
+    """The consumer starts before the producer has finished."""
+    started = threading.Event()
+
+    @znflow.nodify
+    def slow_produce():
+        yield 1
+        assert started.wait(timeout=10)
+        yield 2
+
+    @znflow.nodify(streaming=True)
+    def consume_first(items):
+        result = []
+        for item in items:
+            started.set()
+            result.append(item)
+        return result
+
+    with znflow.DiGraph() as graph:
+        result = consume_first(slow_produce())
+    start = time.perf_counter()
+    graph.run()
+    assert result.result == [1, 2]
+    assert time.perf_counter() - start < 10
+
+
+@znflow.nodify(streaming=True)
+def scale(items, factor):
+    return [item * factor for item in items]
+
+
+def test_stream_edges_unchanged():
+    with znflow.DiGraph() as graph:
+        items = produce(3)
+        factor = collect(2)
+        result = scale(items, factor)
+    edges = graph.number_of_edges()
+    graph.run()
+    assert result.result == [0, 2, 4]
+    assert graph.number_of_edges() == edges
+
+
+def test_stream_handler_only_for_consumers(monkeypatch):
+    subscriptions = []
+
+    class RecordConnectStreams(znflow.handler.ConnectStreams):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            subscriptions.append(self.subscriptions)
+
+    monkeypatch.setattr(znflow.handler, "ConnectStreams", RecordConnectStreams)
+    with znflow.DiGraph() as graph:
+        items = produce(3)
+        factor = collect(2)
+        result = scale(items, factor)
+    graph.run()
+    assert result.result == [0, 2, 4]
+    # only 'scale' consumes a stream
+    assert len(subscriptions) == 1
+    assert list(subscriptions[0]) == [items.uuid]
@@ -0,0 +1,80 @@
+import json
+import logging
+
+import pytest
+
+import znflow
+from znflow import tracing
+
+
+@znflow.nodify
+def add(x, y):
+    return x + y
+
+
+@pytest.fixture(autouse=True)
+def reset_tracing():
+    yield
+    tracing.disable()
+
+
+def test_disabled_by_default():
+    assert not tracing.enabled
+    with znflow.DiGraph():
+        add(add(1, 2), 3)
+    assert not tracing.enabled
+
+
+def test_capture():
+    with tracing.capture() as sink:
+        assert tracing.enabled
+        with znflow.DiGraph() as graph:
+            n1 = add(1, 2)
+            n2 = add(n1, 3)
+    assert not tracing.enabled
+
+    names = [event.name for event in sink.events]
+    assert names == ["add_edge", "add_node", "add_node"]
+    assert sink.events[0].fields["source"].instance is n1
+    assert sink.events[0].fields["target"] is n2
+    assert [event.fields["uuid"] for event in sink.events[1:]] == list(graph)
+
+
+def test_fields_are_not_formatted(monkeypatch):
+    monkeypatch.setattr(tracing, "_safe_repr", pytest.fail)
+    with tracing.capture() as sink:
+        with znflow.DiGraph():
+            add(add(1, 2), 3)
+    assert len(sink.events) == 3
+
+
+def test_logging_sink(caplog):
+    tracing.enable(tracing.LoggingSink())
+    with caplog.at_level(logging.DEBUG, logger="znflow.tracing"):
+        with znflow.DiGraph():
+            add(add(1, 2), 3)
+    assert caplog.messages[0].startswith("add_edge: source=Connection(")
+
+
+def test_file_sink(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    tracing.enable(tracing.FileSink(path))
+    with znflow.DiGraph():
+        add(add(1, 2), 3)
+    tracing.disable()
+
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [event["name"] for event in events] == ["add_edge", "add_node", "add_node"]
+    assert set(events[0]["fields"]) == {"source", "target"}
+
+
+def test_disable_sink():
+    first, second = tracing.MemorySink(), tracing.MemorySink()
+    tracing.enable(first, second)
+    tracing.disable(first)
+    assert tracing.enabled
+    tracing.emit("event", value=1)
+    assert first.events == []
+    assert second.events[0].format() == "event: value=1"
+    tracing.disable(second)
+    assert not tracing.enabled
@@ -83,3 +83,21 @@ def test_repeated_upddates():
     assert converter.updated is True
     assert converter("1") == "1"
     assert converter.updated is False
+
+
+class NestedConvertToString(ConvertToString):
+    """Convert values with a nested call of the same handler."""
+
+    def default(self, value, **kwargs):
+        """Update 'value' and keep no state on the handler."""
+        assert vars(self) == {"updated": self.updated}
+        if isinstance(value, int):
+            return self.handle(str(value), **kwargs)
+        return super().default(value, **kwargs)
+
+
+def test_reentrant_handle():
+    """Test calling 'handle' from within 'default'."""
+    converter = NestedConvertToString()
+    assert converter.handle([1, (2, "3")]) == ["1", ("2", "3")]
+    assert vars(converter) == {"updated": converter.updated}
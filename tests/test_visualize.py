@@ -0,0 +1,65 @@
+import math
+
+import networkx as nx
+import pytest
+
+import znflow
+from znflow.visualize import collapse_groups, get_colors, get_count, get_counts
+
+
+def _get_count_recursive(node, graph) -> int:
+    successors = list(graph.predecessors(node))
+    return sum(_get_count_recursive(x, graph) for x in successors) if successors else 1
+
+
+def test_get_counts():
+    graph = nx.gn_graph(50, seed=42).reverse()
+    counts = get_counts(graph)
+    for node in graph:
+        assert counts[node] == _get_count_recursive(node, graph)
+        assert get_count(node, graph) == counts[node]
+
+
+def test_get_counts_diamonds():
+    """A chain of diamonds has 2**n paths and must not be evaluated recursively."""
+    graph = nx.DiGraph()
+    for idx in range(200):
+        graph.add_edges_from(
+            [
+                (f"{idx}", f"{idx}a"),
+                (f"{idx}", f"{idx}b"),
+                (f"{idx}a", f"{idx + 1}"),
+                (f"{idx}b", f"{idx + 1}"),
+            ]
+        )
+    assert get_count("200", graph) == 2**200
+    assert get_colors(graph, log=True)[-1] == pytest.approx(200 * math.log(2))
+
+
+class PlainNode(znflow.Node):
+    def __init__(self, value):
+        self.value = value
+
+    def run(self):
+        pass
+
+
+def test_collapse_groups():
+    with znflow.DiGraph() as graph:
+        with graph.group("grp1"):
+            n1 = PlainNode(1)
+            n2 = PlainNode(n1.value)
+        n3 = PlainNode(n2.value)
+        with graph.group("grp", "2"):
+            n4 = PlainNode(n3.value)
+            n5 = PlainNode(n1.value)
+
+    collapsed = collapse_groups(graph)
+    assert set(collapsed.nodes) == {"grp1", n3.uuid, "grp/2"}
+    assert set(collapsed.edges) == {
+        ("grp1", n3.uuid),
+        (n3.uuid, "grp/2"),
+        ("grp1", "grp/2"),
+    }
+    assert n4.uuid not in collapsed
+    assert n5.uuid not in collapsed
@@ -4,7 +4,7 @@ import importlib.metadata
 import logging
 import sys
 
-from znflow import deployment, exceptions
+from znflow import deployment, exceptions, tracing
 from znflow.base import (
     CombinedConnections,
     Connection,
@@ -16,7 +16,7 @@ from znflow.base import (
     get_graph,
 )
 from znflow.combine import combine
-from znflow.dynamic import resolve
+from znflow.dynamic import resolve, resolve_async, resolve_many
 from znflow.graph import DiGraph, Group
 from znflow.node import Node, nodify
 from znflow.visualize import draw
@@ -39,8 +39,11 @@ __all__ = [
     "get_graph",
     "empty_graph",
     "resolve",
+    "resolve_many",
+    "resolve_async",
     "Group",
     "deployment",
+    "tracing",
 ]
 
 logger = logging.getLogger(__name__)
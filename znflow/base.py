@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import contextlib
+import contextvars
 import dataclasses
 import typing
 from typing import Any
@@ -19,11 +20,12 @@ def disable_graph(*args, **kwargs):
     This can be useful, if you e.g. want to use 'get_attribute'.
     """
     graph = get_graph()
-    set_graph(empty_graph)
+    # not 'set_graph', because the graph is still under construction
+    _active_graph.set(empty_graph)
     try:
         yield
     finally:
-        set_graph(graph)
+        _active_graph.set(graph)
 
 
 class Property:
@@ -86,6 +88,23 @@ class EmptyGraph:
 
 empty_graph = EmptyGraph()
 
+_active_graph: contextvars.ContextVar = contextvars.ContextVar(
+    "znflow_active_graph", default=empty_graph
+)
+
+
+class _ActiveGraph:
+    """Descriptor to access the active graph of the current context.
+
+    The active graph is stored in a 'contextvars.ContextVar', so every thread
+    and every asyncio task can construct its own graph independently.
+    It is a non-data descriptor, so setting 'instance._graph_' on a Node
+    still overrides the active graph for this instance only.
+    """
+
+    def __get__(self, obj, objtype=None):
+        return _active_graph.get()
+
 
 class NodeBaseMixin:
     """A Parent for all Nodes.
@@ -108,10 +127,35 @@ class NodeBaseMixin:
         _protected_ : list[str]
             A list of attributes that are not allowed to be connected to /
             which are not converted to a Connection.
+        _cost_ : float
+            The estimated runtime of this node, e.g. in seconds.
+            Used to prioritize long chains of nodes in parallel deployments.
+        _resources_ : dict
+            The resources this node requires, e.g. {"cpus": 4, "memory": "8GB"}.
+            Parallel deployments do not oversubscribe these resources.
+        _streaming_ : bool
+            If true, generator nodes connected to this node are passed as an
+            iterator over their items instead of a list, see 'znflow.stream'.
+        _stream_buffer_ : int
+            The number of items buffered for a streaming input.
+            The producer blocks, if this node falls behind.
+        _timeout_ : float
+            The maximum runtime of this node in seconds. Parallel deployments
+            raise a 'NodeTimeoutError', if the node takes longer.
+        _outputs_ : list[str]
+            The names of the attributes written by 'run'. If None, the outputs
+            are the attributes assigned by 'run'. Declare outputs that are
+            modified in-place, to spill them or to only send them back from Dask.
     """
 
-    _graph_ = empty_graph
+    _graph_ = _ActiveGraph()
     _external_ = False
+    _cost_: float = 1.0
+    _resources_: dict = None
+    _streaming_: bool = False
+    _stream_buffer_: int = 16
+    _timeout_: float = None
+    _outputs_: list = None
     _uuid: UUID = None
     _znflow_resolved: bool = False
     _primary_key: str = "uuid"
@@ -139,11 +183,18 @@ class NodeBaseMixin:
 
 
 def get_graph() -> DiGraph:
-    return NodeBaseMixin._graph_
+    return _active_graph.get()
 
 
 def set_graph(value):
-    NodeBaseMixin._graph_ = value
+    from znflow import node
+
+    previous = _active_graph.get()
+    if previous is empty_graph and value is not empty_graph:
+        node.start_graph_construction()
+    _active_graph.set(value)
+    if previous is not empty_graph and value is empty_graph:
+        node.finish_graph_construction()
 
 
 _get_attribute_none = object()
@@ -158,6 +209,58 @@ def get_attribute(obj, name, default=_get_attribute_none):
 
 
 @dataclasses.dataclass(frozen=True)
+class NodePlaceholder:
+    """Stand-in for the node a Connection points to.
+
+    Used to ship a node to a worker without its upstream nodes,
+    see 'DaskDeployment'. The worker replaces the placeholder
+    by the predecessor with the same uuid.
+    """
+
+    uuid: UUID
+    _primary_key = "uuid"
+    _external_ = False
+
+
+@dataclasses.dataclass(frozen=True)
+class ScatteredValue:
+    """Stand-in for a large value that has been sent to the workers in advance.
+
+    The worker replaces the placeholder by the value with the same key,
+    see 'DaskDeployment'.
+    """
+
+    key: str
+
+
+def intern_connection(key, factory: typing.Callable[[], Connection]) -> Connection:
+    """Get a Connection from the cache of the active graph or create it.
+
+    Connections are immutable, so repeated accesses, e.g. to 'node.outputs',
+    can share a single instance instead of allocating a new one every time.
+
+    Attributes
+    ----------
+    key : tuple
+        Identifies the connection, (uuid, attribute) for an attribute of a node
+        and (uuid, attribute, type(item), item) for an item. The type is part of
+        the key, because e.g. 'x[1]' and 'x[True]' are equal dictionary keys.
+    factory : callable
+        Creates the connection, if it is not cached.
+    """
+    graph = get_graph()
+    if graph is empty_graph:
+        return factory()
+    try:
+        return graph._connections[key]
+    except KeyError:
+        connection = graph._connections[key] = factory()
+        return connection
+    except TypeError:  # e.g. 'slice' items are not hashable before Python 3.12
+        return factory()
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
 class Connection:
     """A Connector for Nodes.
 
@@ -181,8 +284,17 @@ class Connection:
         if self.attribute is not None and self.attribute.startswith("_"):
             raise ValueError("Private attributes are not allowed.")
 
+    def __reduce__(self):
+        return type(self), (self.instance, self.attribute, self.item)
+
     def __getitem__(self, item):
-        return dataclasses.replace(self, instance=self, attribute=None, item=item)
+        def factory():
+            return dataclasses.replace(self, instance=self, attribute=None, item=item)
+
+        if isinstance(self.instance, NodeBaseMixin) and self.item is None:
+            key = (self.instance._uuid, self.attribute, type(item), item)
+            return intern_connection(key, factory)
+        return factory()
 
     def __add__(
         self, other: typing.Union[Connection, FunctionFuture, CombinedConnections]
@@ -218,7 +330,7 @@ class Connection:
 
     def __getattribute__(self, __name: str) -> Any:
         try:
-            return super().__getattribute__(__name)
+            return object.__getattribute__(self, __name)
         except AttributeError as e:
             raise exceptions.ConnectionAttributeError(
                 "Connection does not support further attributes to its result."
@@ -228,13 +340,15 @@ class Connection:
         """Overwrite for dynamic break points."""
         from znflow import empty_graph, get_graph, resolve
 
+        if other is self:
+            return True
         if isinstance(other, (Connection)):
             return self.instance == other.instance
         if isinstance(other, (FunctionFuture)):
             return False
 
         if get_graph() is empty_graph:
-            return super().__eq__(other)
+            return object.__eq__(self, other)
         return resolve(self).__eq__(other)
 
     def __lt__(self, other) -> bool:
@@ -242,7 +356,7 @@ class Connection:
         from znflow import empty_graph, get_graph, resolve
 
         if get_graph() is empty_graph:
-            return super().__lt__(other)
+            return object.__lt__(self, other)
         return resolve(self).__lt__(other)
 
     def __le__(self, other) -> bool:
@@ -250,7 +364,7 @@ class Connection:
         from znflow import empty_graph, get_graph, resolve
 
         if get_graph() is empty_graph:
-            return super().__le__(other)
+            return object.__le__(self, other)
         return resolve(self).__le__(other)
 
     def __gt__(self, other) -> bool:
@@ -258,7 +372,7 @@ class Connection:
         from znflow import empty_graph, get_graph, resolve
 
         if get_graph() is empty_graph:
-            return super().__gt__(other)
+            return object.__gt__(self, other)
         return resolve(self).__gt__(other)
 
     def __ge__(self, other) -> bool:
@@ -266,7 +380,7 @@ class Connection:
         from znflow import empty_graph, get_graph, resolve
 
         if get_graph() is empty_graph:
-            return super().__ge__(other)
+            return object.__ge__(self, other)
         return resolve(self).__ge__(other)
 
     def __iter__(self):
@@ -296,7 +410,7 @@ class Connection:
         raise TypeError("Connections can not be appended.")
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class CombinedConnections:
     """Combine multiple Connections into one.
 
@@ -328,6 +442,9 @@ class CombinedConnections:
     connections: typing.List[Connection]
     item: any = None
 
+    def __reduce__(self):
+        return type(self), (self.connections, self.item)
+
     def __add__(
         self, other: typing.Union[Connection, FunctionFuture, CombinedConnections]
     ) -> CombinedConnections:
@@ -413,7 +530,10 @@ class FunctionFuture(NodeBaseMixin):
         self.result = self.function(*self.args, **self.kwargs)
 
     def __getitem__(self, item):
-        return Connection(instance=self, attribute=None, item=item)
+        return intern_connection(
+            (self._uuid, None, type(item), item),
+            lambda: Connection(instance=self, attribute=None, item=item),
+        )
 
     def __add__(
         self, other: typing.Union[Connection, FunctionFuture, CombinedConnections]
@@ -1,3 +1,4 @@
+import itertools
 import typing
 
 from znflow.base import CombinedConnections, Connection, FunctionFuture
@@ -9,6 +10,30 @@ NODE_OR_CONNECTION_OR_COMBINED_OR_FUNC_FUT = typing.Union[
 ARGS_TYPE = typing.List[NODE_OR_CONNECTION_OR_COMBINED_OR_FUNC_FUT]
 
 
+def _combine_connections(args) -> NODE_OR_CONNECTION_OR_COMBINED_OR_FUNC_FUT:
+    """Combine Connections, FunctionFutures and CombinedConnections in a single pass.
+
+    This gives the same result as 'sum(args, [])', without creating
+    a new 'CombinedConnections' and copying the list for every item.
+    """
+    if len(args) == 1:
+        return args[0]
+    first, *others = args
+    if isinstance(first, CombinedConnections):
+        if first.item is not None:
+            raise ValueError("Can not combine multiple slices")
+        connections = list(first.connections)
+    else:
+        # 'Connection + CombinedConnections' does not flatten the second item
+        connections = [first, others.pop(0)]
+    for other in others:
+        if isinstance(other, CombinedConnections):
+            connections.extend(other.connections)
+        else:
+            connections.append(other)
+    return CombinedConnections(connections=connections)
+
+
 def _return_dict_attr(data, attr_name) -> dict:
     """Return a dictionary with the attribute as key and the instances as values."""
     result_dict = {}
@@ -85,10 +110,19 @@ def combine(
                     "znflow.combine tried to use 'getattr' on non-node type from"
                     f" '{args=}'. Consider using 'only_getattr_on_nodes=True'"
                 ) from err
-    try:
-        result = sum(args, [])
-    except TypeError:
-        result = args
+    if not args:
+        result = []
+    elif all(isinstance(arg, list) for arg in args):
+        result = list(itertools.chain.from_iterable(args))
+    elif all(
+        isinstance(arg, (Connection, FunctionFuture, CombinedConnections)) for arg in args
+    ):
+        result = _combine_connections(args)
+    else:
+        try:
+            result = sum(args, [])
+        except TypeError:
+            result = args
 
     if isinstance(result, CombinedConnections):
         if return_dict_attr:
@@ -99,7 +133,11 @@ def combine(
     elif isinstance(result, (Node)):
         if return_dict_attr:
             return {getattr(result, return_dict_attr): result}
-    elif isinstance(result, (list, tuple)) and isinstance(result[0], (Connection, Node)):
+    elif (
+        isinstance(result, (list, tuple))
+        and result
+        and isinstance(result[0], (Connection, Node))
+    ):
         # we assume if the first item is a Connection or Node, all are
         if return_dict_attr:
             return _return_dict_attr(result, return_dict_attr)
@@ -1,8 +1,9 @@
 import contextlib
 
+from .parallel import ParallelDeployment
 from .vanilla import VanillaDeployment
 
-__all__ = ["VanillaDeployment"]
+__all__ = ["VanillaDeployment", "ParallelDeployment"]
 
 with contextlib.suppress(ImportError):
     from .dask_depl import DaskDeployment
@@ -1,17 +1,43 @@
 import abc
+import inspect
+import time
 import typing as t
 
+from znflow import handler
+from znflow.base import FunctionFuture
+from znflow.stream import Stream
+
 if t.TYPE_CHECKING:
     from znflow.graph import DiGraph
+    from znflow.persistence import Checkpoint
+
+
+def get_outputs(node, before: dict) -> t.List[str]:
+    """Get the names of the attributes written by 'Node.run'.
+
+    'before' are the attributes of the node before calling 'Node.run'.
+    Unless the node declares its outputs in 'Node._outputs_',
+    attributes that are modified in-place are not detected.
+    """
+    if isinstance(node, FunctionFuture):
+        return ["result"]
+    if node._outputs_ is not None:
+        return list(node._outputs_)
+    return [
+        key
+        for key, value in vars(node).items()
+        if key not in before or before[key] is not value
+    ]
 
 
 class DeploymentBase(abc.ABC):
     graph: "DiGraph"
+    checkpoint: t.Optional["Checkpoint"] = None
 
     def run(self, nodes: t.Optional[t.List] = None):
-        # nodes = self.graph.get_sorted_nodes()
         if nodes is None:
-            nodes = self.graph.get_sorted_nodes()
+            # nodes on the longest chains are scheduled first
+            nodes = self.graph.get_prioritized_nodes()
         else:
             # Apparently, we don't need to look for
             # parent nodes, because when running
@@ -24,6 +50,74 @@ class DeploymentBase(abc.ABC):
     def set_graph(self, graph: "DiGraph"):
         self.graph = graph
 
+    def _node_finished(self, node_uuid, outputs: t.Iterable[str] = ()):
+        """Spill large outputs and persist the node, if requested.
+
+        'outputs' are the names of the attributes written by 'Node.run',
+        see 'get_outputs'. Only these attributes are spilled.
+        """
+        if self.graph.spill_store is not None:
+            self.graph._spill_node(node_uuid, outputs)
+        if self.checkpoint is not None and "stream" not in self.graph.nodes[node_uuid]:
+            # streams can not be persisted, the node will be rerun on resume.
+            self.checkpoint.save_node(node_uuid)
+
+    def _execute_node(self, node_uuid):
+        """Run a node in this process and mark it as available.
+
+        If the node is a generator, its items are streamed to the consumers,
+        see 'znflow.stream'.
+        """
+        node = self.graph.nodes[node_uuid]["value"]
+        subscriptions = self.graph.nodes[node_uuid].pop("subscriptions", {})
+        try:
+            if subscriptions:
+                # the remaining connections are already edges of the graph
+                self.graph._update_node_attributes(
+                    node,
+                    handler.ConnectStreams(subscriptions, node._streaming_),
+                    add_connections=False,
+                )
+            self.graph._update_node_attributes(node, handler.UpdateConnectors())
+            before = dict(vars(node))
+            start = time.perf_counter()
+            output = node.run()
+            self.graph.nodes[node_uuid]["runtime"] = time.perf_counter() - start
+            outputs = get_outputs(node, before)
+        finally:
+            # do not block the producers on inputs that were not used
+            for remaining in subscriptions.values():
+                for subscription in remaining:
+                    subscription.close()
+
+        if isinstance(node, FunctionFuture):
+            output = node.result
+        if inspect.isgenerator(output):
+            stream = Stream(output)
+            if isinstance(node, FunctionFuture):
+                node.result = stream
+            self.graph.nodes[node_uuid]["stream"] = stream
+            self._subscribe_consumers(node_uuid, stream)
+        self.graph.nodes[node_uuid]["available"] = True
+        self._node_finished(node_uuid, outputs)
+
+    def _subscribe_consumers(self, node_uuid, stream: Stream):
+        """Subscribe all consumers before the stream starts, so no item is missed."""
+        for _, consumer, data in self.graph.out_edges(node_uuid, data=True):
+            if data.get("u_attr") is not None:
+                continue  # connected to a regular attribute of a Node
+            subscription = stream.subscribe(
+                self.graph.nodes[consumer]["value"]._stream_buffer_
+            )
+            consumer_subscriptions = self.graph.nodes[consumer].setdefault(
+                "subscriptions", {}
+            )
+            consumer_subscriptions.setdefault(node_uuid, []).append(subscription)
+
+    def get_priorities(self) -> t.Dict[t.Any, float]:
+        """Get the scheduling priority of every node, see 'get_critical_path_lengths'."""
+        return self.graph.get_critical_path_lengths()
+
     @abc.abstractmethod
     def _run_node(self, node_uuid):
         pass
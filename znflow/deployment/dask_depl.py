@@ -1,17 +1,23 @@
 """ZnFlow deployment using Dask."""
 
+import copy
 import dataclasses
 import typing
 import typing as t
 import uuid
 
+import networkx as nx
+from dask.base import tokenize
 from dask.distributed import Client, Future
+from dask.sizeof import sizeof
 
-from znflow import handler
+from znflow import handler, persistence
+from znflow.base import FunctionFuture, disable_graph
 from znflow.handler import UpdateConnectionsWithPredecessor
 from znflow.node import Node
 
-from .base import DeploymentBase
+from .base import DeploymentBase, get_outputs
+from .parallel import get_resources, run_with_timeout
 
 if typing.TYPE_CHECKING:
     pass
@@ -26,37 +32,135 @@ def node_submit(node, **kwargs):
         the Node class
     kwargs: dict
         predecessors: dict of {uuid: Connection} shape
+        scattered: dict of {key: value} shape, see 'ScatteredValue'
 
     Returns
     -------
     any:
         the Node class with updated state (after calling "Node.run").
+        The names of the attributes written by "Node.run" are stored
+        in '_znflow_changed', see 'get_changes'.
 
     """
     predecessors = kwargs.get("predecessors", {})
+    scattered = kwargs.get("scattered", {})
     updater = UpdateConnectionsWithPredecessor()
+    scattered_updater = handler.UpdateScatteredValues()
     for item in dir(node):
         # TODO this information is available in the graph,
         #  no need to expensively iterate over all attributes
         if item.startswith("_"):
             continue
         value = updater(getattr(node, item), predecessors=predecessors)
-        if updater.updated:
+        updated = updater.updated
+        if scattered:
+            value = scattered_updater(value, scattered=scattered)
+            updated = updated or scattered_updater.updated
+        if updated:
             setattr(node, item, value)
 
-    node.run()
+    before = dict(node.__dict__)
+    run_with_timeout(node.run, node._timeout_, name=node.uuid)
+    node.__dict__["_znflow_changed"] = get_outputs(node, before)
     return node
 
 
+# attributes of the node on the client, that are not sent back from the worker.
+#  A pure task might have been computed for an identical node of another graph.
+_NODE_STATE = frozenset(["_uuid", "_znflow_uuid_", "_znflow_changed"])
+
+
+def get_changes(node) -> t.Tuple[t.List[str], dict]:
+    """Get the outputs of a node returned by 'node_submit'.
+
+    If the node declares its outputs in 'Node._outputs_', only these are sent back
+    to the client, so the transferred data scales with the outputs and not with the
+    inputs of the node. Otherwise, all attributes are sent back, because attributes
+    that are modified in-place can not be detected.
+
+    Returns
+    -------
+    list[str]:
+        The names of the outputs, see 'get_outputs'.
+    dict:
+        The attributes to update on the client.
+    """
+    if isinstance(node, FunctionFuture):
+        return ["result"], {"result": node.result}
+    outputs = node._znflow_changed
+    if node._outputs_ is None:
+        changes = {x: y for x, y in node.__dict__.items() if x not in _NODE_STATE}
+    else:
+        changes = {key: node.__dict__[key] for key in outputs if key in node.__dict__}
+    return outputs, changes
+
+
 # TODO: release the future objects
 @dataclasses.dataclass
 class DaskDeployment(DeploymentBase):
+    """Run the nodes on a Dask cluster.
+
+    Nodes that exceed their 'Node._timeout_' raise a 'NodeTimeoutError'
+    on the worker. Only the outputs declared in 'Node._outputs_' are sent
+    back to the client, see 'get_changes'.
+
+    Attributes
+    ----------
+    client : Client
+        The Dask client to submit the nodes to.
+    retries : int, default=0
+        The number of times a failed or timed out node is resubmitted.
+        Together with a timeout, this re-executes nodes that are stuck on a
+        slow or hung worker, because Dask retries the task on any worker.
+    lightweight : bool, default=True
+        Replace the upstream nodes of all connections by a 'NodePlaceholder'
+        before submitting a node. Otherwise, every upstream node including
+        its results is serialized together with the node.
+    scatter_threshold : int, default=1048576
+        Inputs of at least this number of bytes, e.g. NumPy arrays, tables or
+        models, are scattered to the workers once and shared by all nodes
+        that use the same object, instead of being embedded in every task.
+        Values inside lists, tuples, sets and dicts are checked individually.
+        If None, no values are scattered.
+    broadcast : bool, default=False
+        Send scattered values to all workers instead of a single one.
+    pure : bool, default=False
+        Derive the task keys from a hash of the node type, the function, the
+        parameters and the keys of the upstream nodes and submit with 'pure=True'.
+        Identical nodes, e.g. from a rebuilt graph, then reuse the results that are
+        still held by the cluster. Only use this, if the nodes are deterministic and
+        their code does not change while the cluster is running.
+    """
+
     client: Client = dataclasses.field(default_factory=Client)
+    retries: int = 0
+    lightweight: bool = True
+    scatter_threshold: t.Optional[int] = 2**20
+    broadcast: bool = False
+    pure: bool = False
     results: typing.Dict[uuid.UUID, Future] = dataclasses.field(
         default_factory=dict, init=False
     )
 
+    priorities: typing.Dict[uuid.UUID, float] = dataclasses.field(
+        default_factory=dict, init=False
+    )
+    # id(value): (value, Future), the value is kept alive, so the id is not reused.
+    scattered: typing.Dict[int, tuple] = dataclasses.field(
+        default_factory=dict, init=False, repr=False
+    )
+    # id(value): hash of scattered values, which are expensive to hash.
+    tokens: typing.Dict[int, str] = dataclasses.field(
+        default_factory=dict, init=False, repr=False
+    )
+    # the nodes submitted in the current run
+    submitted: typing.Set[uuid.UUID] = dataclasses.field(
+        default_factory=set, init=False, repr=False
+    )
+
     def run(self, nodes: t.Optional[list] = None):
+        self.priorities = self.get_priorities()
+        self.submitted = set()
         super().run(nodes)
         self._load_results()
 
@@ -77,25 +181,111 @@ class DaskDeployment(DeploymentBase):
                 "External nodes are not supported in Dask deployment"
             )
 
+        # e.g. restored from a checkpoint, these values are sent with the node
+        local = {x for x in predecessors if x not in self.results}
+        detached, scattered = self._detach(node, local)
+        if self.pure:
+            key = f"{node.__class__.__name__}-{self._tokenize(node)}"
+        else:
+            key = f"{node.__class__.__name__}-{node_uuid}"
         self.results[node_uuid] = self.client.submit(
             node_submit,
-            node=node,
-            predecessors={x: self.results[x] for x in self.results if x in predecessors},
-            pure=False,
-            key=f"{node.__class__.__name__}-{node_uuid}",
+            node=detached,
+            predecessors={x: self.results[x] for x in predecessors if x in self.results},
+            scattered=scattered,
+            pure=self.pure,
+            key=key,
+            priority=self.priorities.get(node_uuid, 0),
+            # only pass resources if declared, otherwise the task
+            #  would require workers that define resources.
+            resources=get_resources(node) or None,
+            retries=self.retries,
         )
+        self.submitted.add(node_uuid)
         self.graph.nodes[node_uuid]["available"] = True
 
+    def _scatter(self, value) -> t.Optional[Future]:
+        """Send a large value to the workers, unless this has been done before."""
+        if id(value) in self.scattered:
+            return self.scattered[id(value)][1]
+        if sizeof(value) < self.scatter_threshold:
+            return None
+        # hashing large values is expensive, they are identified by their id instead.
+        future = self.client.scatter(value, broadcast=self.broadcast, hash=False)
+        self.scattered[id(value)] = (value, future)
+        if self.pure:
+            self.tokens[id(value)] = tokenize(value)
+        return future
+
+    def _tokenize(self, node) -> str:
+        """Hash the type, the function, the parameters and the upstream keys of a node."""
+        updater = handler.ConnectionToKey()
+        keys = {
+            x: self.results[x].key
+            for x in self.graph.predecessors(node.uuid)
+            if x in self.results
+        }
+        parameters = sorted(
+            (key, updater(value, keys=keys, tokens=self.tokens))
+            for key, value in vars(node).items()
+            if not key.startswith("_") and key != "function"
+        )
+        # the qualified name does not tell closures or lambdas apart
+        function = tokenize(node.function) if isinstance(node, FunctionFuture) else None
+        return tokenize(persistence.get_type_name(node), function, parameters)
+
+    def _detach(
+        self, node, local: t.Container = ()
+    ) -> t.Tuple[t.Any, t.Dict[str, Future]]:
+        """Copy the node and replace its connections and large values by placeholders.
+
+        The worker fills in the values from the predecessor and scattered futures.
+        Connections to the 'local' nodes, which were not submitted to the cluster,
+        are replaced by their values instead.
+
+        Returns
+        -------
+        Node|FunctionFuture:
+            The node to submit.
+        dict:
+            The futures of the scattered values of the node, {key: Future}.
+        """
+        updaters = []
+        if local:
+            updaters.append(handler.ConnectionToValue(local))
+        if self.lightweight:
+            updaters.append(handler.ConnectionToPlaceholder())
+        if self.scatter_threshold is not None:
+            updaters.append(handler.ScatterLargeValues(self._scatter))
+        if not updaters:
+            return node, {}
+
+        with disable_graph():
+            detached = copy.copy(node)
+        for key, value in list(vars(detached).items()):
+            if key.startswith("_"):
+                continue
+            updated = False
+            for updater in updaters:
+                value = updater(value)
+                updated = updated or updater.updated
+            if updated:
+                detached.__dict__[key] = value
+        scattered = updaters[-1].futures if self.scatter_threshold is not None else {}
+        return detached, scattered
+
     def _load_results(self):
-        # TODO: only load nodes that have actually changed
-        for node_uuid in self.graph.reverse():
+        """Load the outputs of the nodes submitted in the current run."""
+        nodes = [x for x in nx.topological_sort(self.graph) if x in self.submitted]
+        # only transfer the outputs, not the whole nodes, with a single request
+        changes = self.client.gather(
+            [self.client.submit(get_changes, self.results[x], pure=False) for x in nodes]
+        )
+        # all outputs must be loaded before connections to them are resolved
+        for node_uuid, (_, changed) in zip(nodes, changes):
+            self.graph.nodes[node_uuid]["value"].__dict__.update(changed)
+        for node_uuid, (outputs, _) in zip(nodes, changes):
             node = self.graph.nodes[node_uuid]["value"]
-            try:
-                result = self.results[node.uuid].result()
-                if isinstance(node, Node):
-                    node.__dict__.update(result.__dict__)
-                    self.graph._update_node_attributes(node, handler.UpdateConnectors())
-                else:
-                    node.result = result.result
-            except KeyError:
-                pass
+            if isinstance(node, Node):
+                self.graph._update_node_attributes(node, handler.UpdateConnectors())
+            self._node_finished(node_uuid, outputs)
@@ -0,0 +1,432 @@
+"""ZnFlow deployment using a local pool of threads or processes."""
+
+import collections
+import concurrent.futures
+import copy
+import dataclasses
+import heapq
+import os
+import re
+import statistics
+import threading
+import time
+import typing as t
+
+from znflow import exceptions, handler, persistence, shared_memory
+from znflow.base import FunctionFuture
+
+from .base import DeploymentBase, get_outputs
+
+_MEMORY_UNITS = {
+    "": 1,
+    "B": 1,
+    "KB": 10**3,
+    "MB": 10**6,
+    "GB": 10**9,
+    "TB": 10**12,
+    "KIB": 2**10,
+    "MIB": 2**20,
+    "GIB": 2**30,
+    "TIB": 2**40,
+}
+
+
+def parse_memory(value: t.Union[str, int, float]) -> float:
+    """Convert a memory specification like '8GB' or '512 MiB' to bytes."""
+    if isinstance(value, (int, float)):
+        return value
+    match = re.fullmatch(r"\s*([\d.]+)\s*([a-zA-Z]*)\s*", value)
+    if match is None or match.group(2).upper() not in _MEMORY_UNITS:
+        raise ValueError(f"Can not parse memory specification '{value}'.")
+    return float(match.group(1)) * _MEMORY_UNITS[match.group(2).upper()]
+
+
+def normalize_resources(resources: t.Optional[dict]) -> t.Dict[str, float]:
+    """Copy the resources and convert the memory to bytes."""
+    resources = dict(resources or {})
+    if "memory" in resources:
+        resources["memory"] = parse_memory(resources["memory"])
+    return resources
+
+
+def get_resources(node) -> t.Dict[str, float]:
+    """Get the resources a node requires with the memory converted to bytes."""
+    return normalize_resources(getattr(node, "_resources_", None))
+
+
+def _get_total_memory() -> t.Optional[float]:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def run_with_timeout(function: t.Callable, timeout: t.Optional[float], name: str):
+    """Call the function and raise a 'NodeTimeoutError', if it takes too long.
+
+    The function is called in a daemon thread, which is abandoned on timeout.
+    """
+    if timeout is None:
+        return function()
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = function()
+        except BaseException as err:
+            outcome["error"] = err
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise exceptions.NodeTimeoutError(
+            f"Node '{name}' exceeded its timeout of {timeout} s."
+        )
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("result")
+
+
+def _submit_daemon(function: t.Callable, *args) -> concurrent.futures.Future:
+    """Call the function in a daemon thread, which is not owned by a pool.
+
+    Unlike the threads of a 'ThreadPoolExecutor', the thread does not
+    block the exit of the interpreter, if the call is abandoned.
+    """
+    future = concurrent.futures.Future()
+
+    def target():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = function(*args)
+        except BaseException as err:
+            future.set_exception(err)
+        else:
+            future.set_result(result)
+
+    threading.Thread(target=target, daemon=True).start()
+    return future
+
+
+def _terminate_workers(executor: concurrent.futures.ProcessPoolExecutor) -> None:
+    """Stop the worker processes, e.g. of abandoned nodes that are still running."""
+    terminate = getattr(executor, "terminate_workers", None)  # Python >= 3.14
+    if terminate is not None:
+        terminate()
+        return
+    for process in list((executor._processes or {}).values()):
+        process.terminate()
+
+
+_MIN_STRAGGLER_SAMPLES = 3
+
+_registries: t.Dict[bool, shared_memory.SharedMemoryRegistry] = {}
+
+
+def _get_registry(owner: bool) -> shared_memory.SharedMemoryRegistry:
+    """Get the shared memory registry of this process."""
+    if owner not in _registries:
+        _registries[owner] = shared_memory.SharedMemoryRegistry(owner=owner)
+    return _registries[owner]
+
+
+def _run_in_process(data: bytes, shared_memory_threshold: int):
+    """Run a node in a worker process.
+
+    Returns
+    -------
+    bytes:
+        The pickled node after calling 'Node.run'.
+    float:
+        The runtime of the node.
+    list[str]:
+        The names of the attributes written by 'Node.run', see 'get_outputs'.
+    """
+    registry = _get_registry(owner=False)
+    node = shared_memory.loads(data, registry)
+    before = dict(vars(node))
+    start = time.perf_counter()
+    node.run()
+    runtime = time.perf_counter() - start
+    data, _ = shared_memory.dumps(node, registry, shared_memory_threshold)
+    return data, runtime, get_outputs(node, before)
+
+
+@dataclasses.dataclass
+class ParallelDeployment(DeploymentBase):
+    """Run independent nodes concurrently on the local machine.
+
+    Nodes are packed onto the machine according to the resources they
+    declare via 'Node._resources_' or '@nodify(resources=...)', so that
+    the available resources are never oversubscribed.
+    Nodes without a 'cpus' requirement use a single cpu.
+    Nodes that exceed their 'Node._timeout_' raise a 'NodeTimeoutError'.
+    Threads can not be stopped, so in a pool of threads a node with a timeout
+    runs on a deep copy in a daemon thread. If it times out, the copy keeps
+    running until it finishes or the interpreter exits, but its outputs are
+    discarded. Generator nodes with a timeout can not be streamed.
+
+    Attributes
+    ----------
+    resources : dict, default=None
+        The resources available on this machine, e.g. {"cpus": 8, "memory": "16GB"}.
+        Defaults to all cpus and the physical memory.
+        Resources that are not listed here are not limited.
+    processes : bool, default=False
+        Run the nodes in a pool of processes instead of threads.
+        The nodes and their outputs must be picklable,
+        so generator nodes can not be streamed.
+    shared_memory_threshold : int, default=1048576
+        If 'processes' is True, NumPy arrays with at least this number of bytes
+        are transferred through shared memory instead of being pickled.
+    straggler_factor : float, default=None
+        If given, a node that runs longer than 'straggler_factor' times the
+        median runtime of the finished nodes of the same type is started a
+        second time. The attempt that finishes first is kept.
+        In a pool of threads, the attempts run on deep copies of the node,
+        so generator nodes can not be streamed either.
+    straggler_min_time : float, default=1.0
+        A node is never started a second time before it has run for
+        this number of seconds, so short nodes are not duplicated
+        because of scheduling jitter.
+    """
+
+    resources: t.Optional[t.Dict[str, t.Any]] = None
+    processes: bool = False
+    shared_memory_threshold: int = 2**20
+    straggler_factor: t.Optional[float] = None
+    straggler_min_time: float = 1.0
+
+    def __post_init__(self):
+        if self.resources is None:
+            self.resources = {"cpus": os.cpu_count() or 1}
+            memory = _get_total_memory()
+            if memory is not None:
+                self.resources["memory"] = memory
+        self.resources = normalize_resources(self.resources)
+
+    def _get_requirements(self, node_uuid) -> t.Dict[str, float]:
+        requirements = {"cpus": 1, **get_resources(self.graph.nodes[node_uuid]["value"])}
+        for key, value in requirements.items():
+            if value > self.resources.get(key, float("inf")):
+                raise ValueError(
+                    f"Node '{node_uuid}' requires {key}={value}, but only"
+                    f" {self.resources[key]} are available."
+                )
+        return requirements
+
+    def _is_available(self, node_uuid) -> bool:
+        return self.graph.immutable_nodes and self.graph.nodes[node_uuid].get(
+            "available", False
+        )
+
+    def _get_pending_nodes(self, nodes) -> set:
+        """Get all nodes that must run, including the upstream nodes."""
+        if nodes is None:
+            return {x for x in self.graph if not self._is_available(x)}
+        pending = set()
+        stack = [node.uuid for node in nodes]
+        while stack:
+            node_uuid = stack.pop()
+            if node_uuid in pending or self._is_available(node_uuid):
+                continue
+            pending.add(node_uuid)
+            stack.extend(self.graph.predecessors(node_uuid))
+        return pending
+
+    def _get_type_name(self, node_uuid) -> str:
+        return persistence.get_type_name(self.graph.nodes[node_uuid]["value"])
+
+    def _get_runtimes(self) -> t.Dict[str, t.List[float]]:
+        """Get the runtimes of all finished nodes by their type."""
+        runtimes = collections.defaultdict(list)
+        for node_uuid, runtime in self.graph.nodes(data="runtime"):
+            if runtime is not None:
+                runtimes[self._get_type_name(node_uuid)].append(runtime)
+        return runtimes
+
+    def _get_straggler_time(self, node_uuid, runtimes) -> t.Optional[float]:
+        """Get the runtime after which a duplicate of the node is started."""
+        if self.straggler_factor is None:
+            return None
+        samples = runtimes.get(self._get_type_name(node_uuid), [])
+        if len(samples) < _MIN_STRAGGLER_SAMPLES:
+            return None
+        return max(
+            self.straggler_factor * statistics.median(samples), self.straggler_min_time
+        )
+
+    def run(self, nodes: t.Optional[t.List] = None):
+        pending = self._get_pending_nodes(nodes)
+        if not pending:
+            return
+        priorities = self.get_priorities()
+        requirements = {x: self._get_requirements(x) for x in pending}
+        waiting_for = {
+            x: {y for y in self.graph.predecessors(x) if y in pending} for x in pending
+        }
+        ready = [(-priorities[x], str(x), x) for x in pending if not waiting_for[x]]
+        heapq.heapify(ready)
+        free = dict(self.resources)
+        running = {}
+        # time at which the first attempt of a node was started
+        started = {}
+        attempts = collections.Counter()
+        runtimes = self._get_runtimes()
+
+        def fits(node_uuid) -> bool:
+            return all(
+                value <= free.get(key, float("inf"))
+                for key, value in requirements[node_uuid].items()
+            )
+
+        def start(node_uuid) -> None:
+            for key, value in requirements[node_uuid].items():
+                if key in free:
+                    free[key] -= value
+            running[self._submit(executor, node_uuid)] = node_uuid
+            started.setdefault(node_uuid, time.perf_counter())
+            attempts[node_uuid] += 1
+
+        max_workers = max(int(self.resources.get("cpus", 1)), 1)
+        if self.processes:
+            shared_memory.ensure_tracker_running()
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            while pending:
+                # start the highest priority nodes that fit on the machine
+                skipped = []
+                while ready:
+                    item = heapq.heappop(ready)
+                    if not fits(item[-1]):
+                        skipped.append(item)
+                        continue
+                    start(item[-1])
+                for item in skipped:
+                    heapq.heappush(ready, item)
+
+                now = time.perf_counter()
+                deadlines = []
+                for node_uuid in set(running.values()):
+                    node = self.graph.nodes[node_uuid]["value"]
+                    if node._timeout_ is not None:
+                        deadline = started[node_uuid] + node._timeout_
+                        if now >= deadline:
+                            raise exceptions.NodeTimeoutError(
+                                f"Node '{node_uuid}' exceeded its timeout of"
+                                f" {node._timeout_} s."
+                            )
+                        deadlines.append(deadline)
+                    straggler_time = self._get_straggler_time(node_uuid, runtimes)
+                    if straggler_time is None or attempts[node_uuid] > 1:
+                        continue
+                    if now < started[node_uuid] + straggler_time:
+                        deadlines.append(started[node_uuid] + straggler_time)
+                    elif not node._external_ and fits(node_uuid):
+                        start(node_uuid)
+
+                done, _ = concurrent.futures.wait(
+                    running,
+                    timeout=max(min(deadlines) - now, 0) if deadlines else None,
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                for future in done:
+                    node_uuid = running.pop(future)
+                    for key, value in requirements[node_uuid].items():
+                        if key in free:
+                            free[key] += value
+                    if node_uuid not in pending:
+                        continue  # another attempt has finished first
+                    if future.exception() is not None and node_uuid in running.values():
+                        continue  # another attempt might still succeed
+                    self._finish(node_uuid, future)
+                    pending.remove(node_uuid)
+                    runtime = self.graph.nodes[node_uuid].get("runtime")
+                    if runtime is not None:
+                        runtimes[self._get_type_name(node_uuid)].append(runtime)
+                    for successor in self.graph.successors(node_uuid):
+                        if successor in waiting_for:
+                            waiting_for[successor].discard(node_uuid)
+                            if not waiting_for[successor]:
+                                heapq.heappush(
+                                    ready,
+                                    (-priorities[successor], str(successor), successor),
+                                )
+        finally:
+            # do not wait for attempts that lost the race or have timed out
+            if running and self.processes:
+                _terminate_workers(executor)
+            executor.shutdown(wait=not running, cancel_futures=True)
+
+    def _submit(self, executor, node_uuid) -> concurrent.futures.Future:
+        node = self.graph.nodes[node_uuid]["value"]
+        if (
+            not self.processes
+            and self.straggler_factor is None
+            and node._timeout_ is None
+        ):
+            return executor.submit(self._run_node, node_uuid)
+        if node._external_:
+            future = concurrent.futures.Future()
+            future.set_result(None)
+            return future
+        self.graph._update_node_attributes(node, handler.UpdateConnectors())
+        if not self.processes:
+            # attempts that lose the race or time out are abandoned,
+            #  they must not change the node or block the exit.
+            return _submit_daemon(self._run_copy, node_uuid)
+        data, keepalive = shared_memory.dumps(
+            node, _get_registry(owner=True), self.shared_memory_threshold
+        )
+        future = executor.submit(_run_in_process, data, self.shared_memory_threshold)
+        # keep the shared memory blocks alive, until the node has finished
+        future.keepalive = keepalive
+        return future
+
+    def _finish(self, node_uuid, future: concurrent.futures.Future):
+        result = future.result()  # raise exceptions from the node
+        if result is None:
+            return
+        result, runtime, outputs = result
+        if self.processes:
+            result = shared_memory.loads(result, _get_registry(owner=True))
+        node = self.graph.nodes[node_uuid]["value"]
+        if isinstance(node, FunctionFuture):
+            node.result = result.result
+        else:
+            node.__dict__.update(result.__dict__)
+        self.graph.nodes[node_uuid]["runtime"] = runtime
+        self.graph.nodes[node_uuid]["available"] = True
+        self._node_finished(node_uuid, outputs)
+
+    def _run_copy(self, node_uuid):
+        """Run a deep copy of the node, so multiple attempts do not interfere.
+
+        The inputs are copied as well, because 'Node.run' might modify them in-place.
+
+        Returns
+        -------
+        Node|FunctionFuture:
+            The copy after calling 'Node.run'.
+        float:
+            The runtime of the node.
+        list[str]:
+            The names of the attributes written by 'Node.run', see 'get_outputs'.
+        """
+        attempt = copy.deepcopy(self.graph.nodes[node_uuid]["value"])
+        before = dict(vars(attempt))
+        start = time.perf_counter()
+        attempt.run()
+        runtime = time.perf_counter() - start
+        return attempt, runtime, get_outputs(attempt, before)
+
+    def _run_node(self, node_uuid):
+        node = self.graph.nodes[node_uuid]["value"]
+        if node._external_:
+            return
+
+        self._execute_node(node_uuid)
@@ -1,7 +1,5 @@
 import dataclasses
 
-from znflow import handler
-
 from .base import DeploymentBase
 
 
@@ -22,6 +20,4 @@ class VanillaDeployment(DeploymentBase):
         if node._external_:
             return
 
-        self.graph._update_node_attributes(node, handler.UpdateConnectors())
-        node.run()
-        self.graph.nodes[node_uuid]["available"] = True
+        self._execute_node(node_uuid)
@@ -1,3 +1,4 @@
+import concurrent.futures
 import typing as t
 
 from znflow.base import Connection, FunctionFuture, disable_graph, get_graph
@@ -37,3 +38,93 @@ def resolve(value: t.Union[Connection, t.Any]) -> t.Any:
             graph.run(nodes=[value.instance])
         result = value.result
     return result
+
+
+def resolve_many(*values: t.Union[Connection, t.Any]) -> t.List[t.Any]:
+    """Resolve multiple Connections to their actual values at once.
+
+    In contrast to calling 'resolve' for every value, the union of all
+    required nodes is run with a single 'graph.run' call, so the deployment
+    only schedules once and can run independent nodes concurrently.
+
+    Attributes
+    ----------
+    values : Connection
+        The connections to resolve.
+
+    Returns
+    -------
+    list
+        The actual values of the connections, in the given order.
+
+    """
+    with disable_graph():
+        results = [
+            value.result if isinstance(value, (Connection, FunctionFuture)) else value
+            for value in values
+        ]
+    nodes = {}
+    for value, result in zip(values, results):
+        if result is not None or not isinstance(value, (Connection, FunctionFuture)):
+            continue
+        # we assume, that if the result is None, the node has not been run yet
+        node = value if isinstance(value, FunctionFuture) else value.instance
+        nodes.setdefault(node.uuid, node)
+    if not nodes:
+        return results
+
+    graph = get_graph()
+    with disable_graph():
+        graph.run(nodes=list(nodes.values()))
+        return [
+            value.result if isinstance(value, (Connection, FunctionFuture)) else value
+            for value in values
+        ]
+
+
+def resolve_async(
+    value: t.Union[Connection, t.Any], speculative: bool = False
+) -> concurrent.futures.Future:
+    """Resolve a Connection to its actual value in the background.
+
+    In contrast to 'resolve', this returns immediately, so the graph can be
+    built further while the deployment computes the value, see 'DiGraph.run_async'.
+
+    Attributes
+    ----------
+    value : Connection
+        The connection to resolve.
+    speculative : bool, default=False
+        Also run all other nodes that have been added to the graph so far,
+        to use idle resources while the graph is still being built.
+
+    Returns
+    -------
+    concurrent.futures.Future
+        The handle to the actual value of the connection,
+        available via 'handle.result()'.
+
+    """
+    handle = concurrent.futures.Future()
+    if not isinstance(value, (Connection, FunctionFuture)):
+        handle.set_result(value)
+        return handle
+    with disable_graph():
+        result = value.result
+    if result is not None:
+        handle.set_result(result)
+        return handle
+
+    graph = get_graph()
+    node = value if isinstance(value, FunctionFuture) else value.instance
+    future = graph.run_async(nodes=None if speculative else [node])
+
+    def set_result(future: concurrent.futures.Future):
+        if future.exception() is not None:
+            handle.set_exception(future.exception())
+            return
+        with disable_graph():
+            handle.set_result(value.result)
+
+    future.add_done_callback(set_result)
+    return handle
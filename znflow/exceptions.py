@@ -3,3 +3,7 @@
 
 class ConnectionAttributeError(AttributeError):
     """Raised when a connection attribute is not found."""
+
+
+class NodeTimeoutError(TimeoutError):
+    """Raised when a node exceeds its timeout, see 'NodeBaseMixin._timeout_'."""
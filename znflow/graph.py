@@ -1,17 +1,23 @@
+import concurrent.futures
 import contextlib
+import copy
 import dataclasses
 import functools
-import logging
+import heapq
+import pathlib
+import threading
 import typing
 import uuid
 
 import networkx as nx
 
-from znflow import handler
+from znflow import handler, persistence, spill, tracing
 from znflow.base import (
+    CombinedConnections,
     Connection,
     FunctionFuture,
     NodeBaseMixin,
+    disable_graph,
     empty_graph,
     get_graph,
     set_graph,
@@ -19,7 +25,17 @@ from znflow.base import (
 from znflow.deployment import VanillaDeployment
 from znflow.node import Node
 
-log = logging.getLogger(__name__)
+# values that can be or contain connections, everything else is not updated
+_CONNECTABLE = (list, tuple, set, dict, Connection, CombinedConnections, NodeBaseMixin)
+
+
+def _flatten(nodes) -> typing.Iterator:
+    """Flatten nested lists and tuples of nodes."""
+    for node in nodes:
+        if isinstance(node, (list, tuple)):
+            yield from _flatten(node)
+        else:
+            yield node
 
 
 @dataclasses.dataclass
@@ -27,6 +43,12 @@ class Group:
     names: tuple[str, ...]
     uuids: list[uuid.UUID]
     graph: "DiGraph"
+    _uuids_set: set = dataclasses.field(
+        default_factory=set, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        self._uuids_set.update(self.uuids)
 
     def __iter__(self) -> typing.Iterator[uuid.UUID]:
         return iter(self.uuids)
@@ -35,7 +57,13 @@ class Group:
         return len(self.uuids)
 
     def __contains__(self, item) -> bool:
-        return item in self.uuids
+        return item in self._uuids_set
+
+    def add(self, node_uuid: uuid.UUID) -> None:
+        """Add a node to the group, if it is not already part of it."""
+        if node_uuid not in self._uuids_set:
+            self._uuids_set.add(node_uuid)
+            self.uuids.append(node_uuid)
 
     def __getitem__(self, item) -> NodeBaseMixin:
         return self.graph.nodes[item]["value"]
@@ -47,7 +75,14 @@ class Group:
 
 class DiGraph(nx.MultiDiGraph):
     def __init__(
-        self, *args, disable=False, immutable_nodes=True, deployment=None, **kwargs
+        self,
+        *args,
+        disable=False,
+        immutable_nodes=True,
+        deployment=None,
+        spill_threshold: typing.Optional[int] = None,
+        spill_directory=None,
+        **kwargs,
     ):
         """
         Attributes
@@ -56,11 +91,27 @@ class DiGraph(nx.MultiDiGraph):
             If True, the nodes are assumed to be immutable and
             will not be rerun. If you change the inputs of a node
             after it has been run, the outputs will not be updated.
+        spill_threshold : int, default=None
+            If given, NumPy arrays with at least this number of bytes that are
+            assigned by 'Node.run' are written to disk after the node has finished
+            and replaced by memory-mapped arrays, see 'znflow.spill.SpillStore'.
+        spill_directory : str|os.PathLike, default=None
+            The directory for spilled outputs. Defaults to a temporary directory.
         """
         self.disable = disable
         self.immutable_nodes = immutable_nodes
+        self.spill_store = None
+        if spill_threshold is not None:
+            self.spill_store = spill.SpillStore(spill_threshold, spill_directory)
         self.groups = {}
         self.active_group: typing.Union[Group, None] = None
+        self._edge_buffer: typing.Union[list, None] = None
+        # (uuid, attribute[, type(item), item]): Connection, see 'intern_connection'
+        self._connections: typing.Dict[tuple, Connection] = {}
+        # uuid: Future of the background run computing this node, see 'run_async'
+        self._running: typing.Dict[uuid.UUID, concurrent.futures.Future] = {}
+        # guards '_running' and the node data, which background runs update
+        self._running_lock = threading.Lock()
         self.deployment = deployment or VanillaDeployment()
         self.deployment.set_graph(self)
 
@@ -74,6 +125,17 @@ class DiGraph(nx.MultiDiGraph):
         """
         return functools.partial(handler.AddConnectionToGraph(), graph=self)
 
+    def __getstate__(self):
+        """Drop the state of background runs, which can not be pickled."""
+        state = self.__dict__.copy()
+        state["_running"] = {}
+        del state["_running_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._running_lock = threading.Lock()
+
     def __enter__(self):
         if self.disable:
             return self
@@ -102,22 +164,28 @@ class DiGraph(nx.MultiDiGraph):
                 node_instance._znflow_resolved = True
             elif isinstance(node_instance, FunctionFuture):
                 pass  # moved to add_node
-            log.debug(f"Node {node} ({node_instance}) was added to the graph.")
+            if tracing.enabled:
+                tracing.emit("add_node", uuid=node, node=node_instance)
 
     def _update_function_future_arguments(self, node_instance: FunctionFuture) -> None:
         """Apply an update to args and kwargs of a FunctionFuture."""
-        node_instance.args = handler.AttributeToConnection()(node_instance.args)
-        node_instance.kwargs = handler.AttributeToConnection()(node_instance.kwargs)
-        self.add_connections_from_iterable(
-            node_instance.args, node_instance=node_instance
-        )
-        self.add_connections_from_iterable(
-            node_instance.kwargs, node_instance=node_instance
+        node_instance.args, node_instance.kwargs = handler.ConnectArguments()(
+            (node_instance.args, node_instance.kwargs),
+            graph=self,
+            node_instance=node_instance,
         )
 
-    def _update_node_attributes(self, node_instance: Node, updater) -> None:
-        """Apply an updater to all attributes of a node."""
-        for attribute in dir(node_instance):
+    def _get_node_attributes(
+        self, node_instance: Node
+    ) -> typing.Iterator[typing.Tuple[str, typing.Any]]:
+        """Get the public attributes of a node, that can hold connections."""
+        is_dataclass = dataclasses.is_dataclass(node_instance)
+        if is_dataclass and hasattr(node_instance, "__dict__"):
+            # only the values in '__dict__' are used, see below
+            attributes = sorted(node_instance.__dict__)
+        else:
+            attributes = dir(node_instance)
+        for attribute in attributes:
             if attribute.startswith("_") or attribute in Node._protected_:
                 # We do not allow connections to private attributes.
                 continue
@@ -128,7 +196,7 @@ class DiGraph(nx.MultiDiGraph):
                 # We do not want to call getter of properties.
                 continue
             try:
-                if dataclasses.is_dataclass(node_instance):
+                if is_dataclass:
                     value = node_instance.__dict__[attribute]
                 else:
                     value = getattr(node_instance, attribute)
@@ -137,20 +205,49 @@ class DiGraph(nx.MultiDiGraph):
                 #  For example, it could be a property that is not yet set.
                 #  In this case we skip updating the attribute, no matter the exception.
                 continue
+            yield attribute, value
+
+    def _update_node_attributes(
+        self, node_instance: Node, updater, add_connections: bool = True
+    ) -> None:
+        """Apply an updater to all attributes of a node.
+
+        If 'add_connections' is True, the connections in the updated
+        attributes are added to the graph.
+        """
+        for attribute, value in self._get_node_attributes(node_instance):
             value = updater(value)
             if updater.updated:
                 try:
                     setattr(node_instance, attribute, value)
                 except AttributeError:
                     continue
-            self.add_connections_from_iterable(
-                value, node_instance=node_instance, attribute=attribute
-            )
+            if add_connections:
+                self.add_connections_from_iterable(
+                    value, node_instance=node_instance, attribute=attribute
+                )
+
+    def _spill_node(self, node_uuid, outputs: typing.Iterable[str]) -> None:
+        """Spill the large outputs of a finished node to disk.
+
+        Only the given attributes are spilled, the inputs are left untouched.
+        """
+        node_instance = self.nodes[node_uuid]["value"]
+        updater = handler.SpillToDisk(self.spill_store)
+        for attribute in outputs:
+            if attribute.startswith("_"):
+                continue
+            value = updater(getattr(node_instance, attribute))
+            if updater.updated:
+                with contextlib.suppress(AttributeError):
+                    setattr(node_instance, attribute, value)
 
     def add_znflow_node(self, node_for_adding, this_uuid=None, **attr):
         if isinstance(node_for_adding, NodeBaseMixin):
             if this_uuid is None:
                 this_uuid = node_for_adding.uuid
+            if self.active_group is not None and this_uuid not in self:
+                self.active_group.add(this_uuid)
             super().add_node(this_uuid, value=node_for_adding, **attr)
         else:
             raise ValueError(f"Only Nodes are supported, found '{node_for_adding}'.")
@@ -159,9 +256,8 @@ class DiGraph(nx.MultiDiGraph):
             self._update_function_future_arguments(node_for_adding)
 
     def add_connections(self, u_of_edge, v_of_edge, **attr):
-        with contextlib.suppress(TypeError):
-            # zninit does not like __repr__
-            log.debug(f"Add edge between {u_of_edge=} and {v_of_edge=}.")
+        if tracing.enabled:
+            tracing.emit("add_edge", source=u_of_edge, target=v_of_edge)
         if isinstance(u_of_edge, Connection) and isinstance(v_of_edge, NodeBaseMixin):
             if u_of_edge.uuid not in self:
                 if u_of_edge._external_:
@@ -182,15 +278,78 @@ class DiGraph(nx.MultiDiGraph):
             # TODO what if 'v_attr' is a list/dict/... that contains multiple connections?
             #  Is this relevant? We could do `v_attr.<dict_key>` or `v_attr.<list_index>`
             #  See test_node.test_ListConnection and test_node.test_DictionaryConnection
-            self.add_edge(
-                u_of_edge.uuid,
-                v_of_edge.uuid,
-                u_attr=u_of_edge.attribute,
-                **attr,
-            )
+            if self._edge_buffer is not None:
+                self._edge_buffer.append(
+                    (
+                        u_of_edge.uuid,
+                        v_of_edge.uuid,
+                        {"u_attr": u_of_edge.attribute, **attr},
+                    )
+                )
+            else:
+                self.add_edge(
+                    u_of_edge.uuid,
+                    v_of_edge.uuid,
+                    u_attr=u_of_edge.attribute,
+                    **attr,
+                )
         else:
             raise ValueError("Only Connections and Nodes are supported.")
 
+    def add_nodes_bulk(self, nodes: typing.Iterable[NodeBaseMixin]) -> None:
+        """Add many nodes to the graph at once.
+
+        In contrast to calling 'add_znflow_node' for every node, all nodes are
+        inserted first. The attributes of every node are then converted to
+        connections and the connections are collected in a single pass, before
+        they are added to the graph with a single 'add_edges_from' call.
+        This is useful for programmatically generated graphs, where the nodes are
+        created outside the graph context. Nodes that are already part of the
+        graph are skipped.
+
+        Attributes
+        ----------
+        nodes : list[Node|FunctionFuture]
+            The nodes to add. Nested lists and tuples are flattened.
+        """
+        new_nodes = {}
+        for node in _flatten(nodes):
+            if not isinstance(node, NodeBaseMixin):
+                raise ValueError(f"Only Nodes are supported, found '{node}'.")
+            if node.uuid not in self:
+                new_nodes.setdefault(node.uuid, node)
+        nodes = list(new_nodes.values())
+        if self.active_group is not None:
+            for node_uuid in new_nodes:
+                self.active_group.add(node_uuid)
+        super().add_nodes_from((node.uuid, {"value": node}) for node in nodes)
+
+        connect = handler.ConnectArguments()
+        self._edge_buffer = []
+        try:
+            with disable_graph():
+                for node in nodes:
+                    if isinstance(node, FunctionFuture):
+                        self._update_function_future_arguments(node)
+                    elif isinstance(node, Node):
+                        self._connect_node_attributes(node, connect)
+                        node._znflow_resolved = True
+            self.add_edges_from(self._edge_buffer)
+        finally:
+            self._edge_buffer = None
+
+    def _connect_node_attributes(self, node_instance: Node, connect) -> None:
+        """Convert the attributes of a node to connections and add them as edges."""
+        for attribute, value in self._get_node_attributes(node_instance):
+            if not isinstance(value, _CONNECTABLE):
+                continue  # e.g. numbers, strings or methods
+            value = connect(
+                value, graph=self, node_instance=node_instance, attribute=attribute
+            )
+            if connect.updated:
+                with contextlib.suppress(AttributeError):
+                    setattr(node_instance, attribute, value)
+
     def get_sorted_nodes(self):
         all_pipelines = []
         reverse = self.reverse(copy=False)
@@ -198,20 +357,232 @@ class DiGraph(nx.MultiDiGraph):
             all_pipelines += nx.dfs_postorder_nodes(reverse, stage)
         return list(dict.fromkeys(all_pipelines))  # remove duplicates but keep order
 
+    def get_critical_path_lengths(self) -> typing.Dict[typing.Any, float]:
+        """Get the length of the longest downstream chain for every node.
+
+        The length is weighted by the cost of each node on the chain.
+        The cost is the observed 'runtime' of a previous run, if available,
+        or the declared 'Node._cost_' otherwise.
+        """
+        lengths = {}
+        for node_uuid in reversed(list(nx.topological_sort(self))):
+            data = self.nodes[node_uuid]
+            cost = data.get("runtime", getattr(data["value"], "_cost_", 1.0))
+            lengths[node_uuid] = cost + max(
+                (lengths[x] for x in self.successors(node_uuid)), default=0.0
+            )
+        return lengths
+
+    def get_prioritized_nodes(self) -> list:
+        """Get the nodes in topological order, prioritized by critical path length.
+
+        Whenever multiple nodes are ready to run, the node with the longest
+        critical path is scheduled first, see 'get_critical_path_lengths'.
+        """
+        lengths = self.get_critical_path_lengths()
+        in_degree = {node_uuid: len(self.pred[node_uuid]) for node_uuid in self}
+        order = {node_uuid: idx for idx, node_uuid in enumerate(self)}
+        ready = [
+            (-lengths[node_uuid], order[node_uuid], node_uuid)
+            for node_uuid, degree in in_degree.items()
+            if degree == 0
+        ]
+        heapq.heapify(ready)
+        nodes = []
+        while ready:
+            *_, node_uuid = heapq.heappop(ready)
+            nodes.append(node_uuid)
+            for successor in self.successors(node_uuid):
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    heapq.heappush(
+                        ready, (-lengths[successor], order[successor], successor)
+                    )
+        return nodes
+
     def run(
         self,
         nodes: typing.Optional[typing.List[NodeBaseMixin]] = None,
+        groups: typing.Optional[typing.List[typing.Union[Group, str, tuple]]] = None,
+        checkpoint=None,
+        resume_from=None,
     ):
         """Run the graph.
 
         Attributes
         ----------
         nodes : list[Node]
-            The nodes to run. If None, all nodes are run.
+            The nodes to run. If None and no groups are given, all nodes are run.
+        groups : list[Group|str|tuple[str, ...]]
+            Only run the nodes of the given groups and the nodes they depend on.
+            Groups can be given as 'Group' instances or by their name(s).
+            Deployments that execute nodes asynchronously, e.g. the
+            'DaskDeployment', run independent groups concurrently.
+        checkpoint : str|os.PathLike
+            Persist every node to this directory as soon as it has finished.
+        resume_from : str|os.PathLike
+            Restore the finished nodes from this checkpoint directory and only
+            run the remaining nodes. New checkpoints are written to the same
+            directory, unless 'checkpoint' is given.
         """
-        self.deployment.run(nodes)
+        # nodes computed in the background must not be run twice
+        self.wait()
+        if groups is not None:
+            nodes = list(nodes or []) + self._get_group_nodes(groups)
+        if resume_from is not None:
+            if not self.immutable_nodes:
+                raise ValueError("Resuming a run requires 'immutable_nodes=True'.")
+            checkpoint = checkpoint or resume_from
+        if checkpoint is None:
+            self.deployment.run(nodes)
+            return
+
+        self.deployment.checkpoint = persistence.Checkpoint(checkpoint, graph=self)
+        try:
+            restored = []
+            if resume_from is not None:
+                restored = persistence.Checkpoint(resume_from, graph=self).restore()
+            self.deployment.checkpoint.write_index()
+            same_directory = resume_from is not None and (
+                pathlib.Path(checkpoint).resolve() == pathlib.Path(resume_from).resolve()
+            )
+            for node_uuid in restored:
+                if same_directory:
+                    self.deployment.checkpoint.saved.add(node_uuid)
+                else:
+                    self.deployment.checkpoint.save_node(node_uuid)
+            self.deployment.run(nodes)
+        finally:
+            self.deployment.checkpoint = None
+
+    def wait(self) -> None:
+        """Wait until all background runs, see 'run_async', have finished."""
+        with self._running_lock:
+            futures = set(self._running.values())
+        concurrent.futures.wait(futures)
+
+    def _get_background_nodes(
+        self, nodes: typing.Optional[typing.List[NodeBaseMixin]]
+    ) -> typing.Tuple[set, set]:
+        """Get the nodes for a background run.
+
+        Returns
+        -------
+        set:
+            The uuids of the nodes that must be run, including the upstream nodes.
+        set:
+            The futures of other background runs, that compute upstream nodes.
+        """
+
+        def is_available(node_uuid) -> bool:
+            return self.immutable_nodes and self.nodes[node_uuid].get("available", False)
+
+        if nodes is None:
+            stack = list(self)
+        else:
+            stack = [node.uuid for node in nodes]
+        required, wait_for = set(), set()
+        while stack:
+            node_uuid = stack.pop()
+            if node_uuid in required or is_available(node_uuid):
+                continue
+            future = self._running.get(node_uuid)
+            if future is not None:
+                wait_for.add(future)
+                continue
+            required.add(node_uuid)
+            stack.extend(self.predecessors(node_uuid))
+        return required, wait_for
+
+    def run_async(
+        self, nodes: typing.Optional[typing.List[NodeBaseMixin]] = None
+    ) -> concurrent.futures.Future:
+        """Run nodes in a background thread, while the graph is still being built.
+
+        The nodes and their upstream nodes are copied into a separate graph,
+        so nodes can be added to this graph while the background run is active.
+        Nodes that are already computed by another background run are not run again.
+
+        The background run shares the node instances and the state of the deployment,
+        e.g. the results of a 'DaskDeployment', with this graph. Do not run, modify
+        or read the outputs of these nodes, until the returned future has finished.
+
+        Attributes
+        ----------
+        nodes : list[Node]
+            The nodes to run. If None, all nodes of the graph are run.
 
-    def write_graph(self, *args):
+        Returns
+        -------
+        concurrent.futures.Future:
+            Finishes, once all nodes are available.
+        """
+        with self._running_lock:
+            required, wait_for = self._get_background_nodes(nodes)
+            future = concurrent.futures.Future()
+            for node_uuid in required:
+                self._running[node_uuid] = future
+        deployment = copy.copy(self.deployment)
+        deployment.checkpoint = None
+        subgraph = DiGraph(immutable_nodes=self.immutable_nodes, deployment=deployment)
+        subgraph.spill_store = self.spill_store
+        subgraph.add_nodes_from((x, dict(self.nodes[x])) for x in required)
+        edges = list(self.in_edges(required, keys=True, data=True))
+        # available upstream nodes or nodes of other background runs
+        sources = {edge[0] for edge in edges} - required
+
+        def run():
+            try:
+                for other in wait_for:
+                    other.result()  # raise, if upstream nodes failed
+                with self._running_lock:
+                    subgraph.add_nodes_from((x, dict(self.nodes[x])) for x in sources)
+                subgraph.add_edges_from(edges)
+                subgraph.run()
+            except BaseException as err:
+                error = err
+            else:
+                error = None
+            finally:
+                with self._running_lock:
+                    if error is None:
+                        for node_uuid in required:
+                            self.nodes[node_uuid].update(subgraph.nodes[node_uuid])
+                    for node_uuid in required:
+                        self._running.pop(node_uuid, None)
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+        threading.Thread(target=run, daemon=True).start()
+        return future
+
+    def _get_group_nodes(self, groups) -> typing.List[NodeBaseMixin]:
+        """Collect the unique nodes of the given groups."""
+        nodes = {}
+        for group in groups:
+            if isinstance(group, str):
+                group = self.get_group(group)
+            elif isinstance(group, tuple):
+                group = self.get_group(*group)
+            for node_uuid in group:
+                nodes.setdefault(node_uuid, self.nodes[node_uuid]["value"])
+        return list(nodes.values())
+
+    def write_graph(self, *args, bulk: bool = False):
+        """Add the given nodes and their connections to the graph.
+
+        Attributes
+        ----------
+        args : Node|FunctionFuture|list
+            The nodes to add. Nested lists and tuples are flattened.
+        bulk : bool, default=False
+            Use 'add_nodes_bulk' to insert all nodes and connections at once.
+        """
+        if bulk:
+            self.add_nodes_bulk(args)
+            return
         for node in args:
             if isinstance(node, (list, tuple)):
                 self.write_graph(*node)
@@ -256,15 +627,12 @@ class DiGraph(nx.MultiDiGraph):
                 " is still active."
             )
 
-        existing_nodes = self.get_sorted_nodes()
-
         group = self.groups.get(names, Group(names=names, uuids=[], graph=self))
 
         def finalize_group():
+            # nodes are added to the active group in 'add_znflow_node'
+            self.active_group = None
             self.groups[group.names] = group
-            for node_uuid in self.nodes:
-                if node_uuid not in existing_nodes:
-                    group.uuids.append(node_uuid)
 
         try:
             self.active_group = group
@@ -284,3 +652,46 @@ class DiGraph(nx.MultiDiGraph):
 
     def get_group(self, *names: str) -> Group:
         return self.groups[names]
+
+    def save(self, path, array_threshold: int = 2**16) -> None:
+        """Save the graph including the state and results of all nodes.
+
+        Large NumPy arrays are stored as raw '.npy' files, which are
+        memory-mapped when the graph is loaded again.
+        The deployment is not saved.
+
+        Attributes
+        ----------
+        path : str|os.PathLike
+            The directory to save the graph to.
+        array_threshold : int, default=65536
+            NumPy arrays with at least this number of bytes are stored
+            as '.npy' files instead of being pickled.
+        """
+        state = {
+            "immutable_nodes": self.immutable_nodes,
+            "nodes": list(self.nodes(data=True)),
+            "edges": list(self.edges(keys=True, data=True)),
+            "groups": {names: group.uuids for names, group in self.groups.items()},
+        }
+        persistence.dump(state, path, array_threshold=array_threshold)
+
+    @classmethod
+    def load(cls, path, **kwargs) -> "DiGraph":
+        """Load a graph that was written with 'DiGraph.save'.
+
+        Attributes
+        ----------
+        path : str|os.PathLike
+            The directory the graph was saved to.
+        kwargs : dict
+            Additional arguments to create the graph, e.g. the deployment.
+        """
+        state = persistence.load(path)
+        kwargs.setdefault("immutable_nodes", state["immutable_nodes"])
+        graph = cls(**kwargs)
+        graph.add_nodes_from(state["nodes"])
+        graph.add_edges_from(state["edges"])
+        for names, uuids in state["groups"].items():
+            graph.groups[names] = Group(names=names, uuids=list(uuids), graph=graph)
+        return graph
@@ -1,7 +1,14 @@
 import dataclasses
+import typing as t
 
 from znflow import utils
-from znflow.base import CombinedConnections, Connection, FunctionFuture
+from znflow.base import (
+    CombinedConnections,
+    Connection,
+    FunctionFuture,
+    NodePlaceholder,
+    ScatteredValue,
+)
 from znflow.node import Node
 
 
@@ -26,6 +33,28 @@ class AddConnectionToGraph(utils.IterableHandler):
                 graph.add_connections(value, node_instance, v_attr=v_attr)
 
 
+class ConnectArguments(utils.IterableHandler):
+    """Combine 'AttributeToConnection' and 'AddConnectionToGraph' in one pass.
+
+    Nodes are replaced by connections and every connection is added
+    to the graph as an edge to 'node_instance'. If 'attribute' is given,
+    it is stored as the 'v_attr' of the edges.
+    """
+
+    def default(self, value, **kwargs):
+        if isinstance(value, (FunctionFuture, Node)) and value._graph_ is not None:
+            value = Connection(instance=value, attribute=None)
+        if isinstance(value, Connection):
+            v_attr = kwargs.get("attribute")
+            if v_attr is None:
+                kwargs["graph"].add_connections(value, kwargs["node_instance"])
+            else:
+                kwargs["graph"].add_connections(
+                    value, kwargs["node_instance"], v_attr=v_attr
+                )
+        return value
+
+
 class UpdateConnectors(utils.IterableHandler):
     def default(self, value, **kwargs):
         if isinstance(value, (Connection, CombinedConnections)):
@@ -81,5 +110,154 @@ class UpdateConnectionsWithPredecessor(utils.IterableHandler):
         predecessors = kwargs["predecessors"]
         if isinstance(value, Connection):
             # We don't actually need the connection, we need the results.
-            return dataclasses.replace(value, instance=predecessors[value.uuid]).result
+            return _replace_instance(value, predecessors[value.uuid]).result
         return value
+
+
+def _replace_instance(connection: Connection, instance) -> Connection:
+    """Replace the node a, possibly nested, Connection points to."""
+    if isinstance(connection.instance, Connection):
+        instance = _replace_instance(connection.instance, instance)
+    return dataclasses.replace(connection, instance=instance)
+
+
+class ScatterLargeValues(utils.IterableHandler):
+    """Iterable handler for replacing large values by 'ScatteredValue' placeholders."""
+
+    def __init__(self, scatter: t.Callable):
+        """
+        Attributes
+        ----------
+        scatter : callable
+            Sends a large value to the workers and returns its future,
+            or returns None if the value is small.
+        """
+        super().__init__()
+        self.scatter = scatter
+        self.futures = {}
+
+    def default(self, value, **kwargs):
+        future = self.scatter(value)
+        if future is None:
+            return value
+        self.futures[future.key] = future
+        return ScatteredValue(future.key)
+
+
+class UpdateScatteredValues(utils.IterableHandler):
+    """Iterable handler for restoring scattered values on the worker."""
+
+    def default(self, value, **kwargs):
+        """Replace the placeholder by the value from 'scattered', a {key: value} dict."""
+        if isinstance(value, ScatteredValue):
+            return kwargs["scattered"][value.key]
+        return value
+
+
+class ConnectionToValue(utils.IterableHandler):
+    """Iterable handler for resolving the connections to some nodes in advance."""
+
+    def __init__(self, uuids: t.Container):
+        """
+        Attributes
+        ----------
+        uuids : Container
+            The uuids of the nodes, whose connections are replaced by their values.
+        """
+        super().__init__()
+        self.uuids = uuids
+
+    def default(self, value, **kwargs):
+        if isinstance(value, Connection) and value.uuid in self.uuids:
+            return value.result
+        return value
+
+
+class ConnectionToPlaceholder(utils.IterableHandler):
+    """Iterable handler for detaching connections from their upstream nodes."""
+
+    def default(self, value, **kwargs):
+        """Replace the node of a connection by a 'NodePlaceholder'.
+
+        This way, the upstream nodes are not serialized together with the connection.
+        """
+        if isinstance(value, Connection):
+            return _replace_instance(value, NodePlaceholder(value.uuid))
+        return value
+
+
+class SpillToDisk(utils.IterableHandler):
+    """Iterable handler for spilling large values to disk."""
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+
+    def default(self, value, **kwargs):
+        """Replace large values by memory-mapped values, see 'SpillStore.spill'."""
+        return self.store.spill(value)
+
+
+class ConnectStreams(utils.IterableHandler):
+    """Iterable handler for replacing connections to generator nodes."""
+
+    def __init__(self, subscriptions: dict, streaming: bool):
+        """
+        Attributes
+        ----------
+        subscriptions : dict
+            {uuid: [Subscription]} of the generator nodes connected to this node.
+        streaming : bool
+            If True, pass the subscriptions instead of lists of all items.
+        """
+        super().__init__()
+        self.subscriptions = subscriptions
+        self.streaming = streaming
+
+    def default(self, value, **kwargs):
+        if not isinstance(value, Connection) or value.attribute is not None:
+            return value
+        if isinstance(value.instance, Connection):
+            # e.g. 'future[0]' is a connection to the connection of the future
+            return value
+        subscriptions = self.subscriptions.get(value.uuid)
+        if not subscriptions:
+            return value
+        subscription = subscriptions.pop()
+        if value.item is not None:
+            return list(subscription)[value.item]
+        return subscription if self.streaming else list(subscription)
+
+
+def _get_path(connection: Connection) -> list:
+    """Get the (attribute, item) pairs of a, possibly nested, Connection."""
+    path = []
+    while isinstance(connection, Connection):
+        path.append((connection.attribute, connection.item))
+        connection = connection.instance
+    return path
+
+
+class ConnectionToKey(utils.IterableHandler):
+    """Iterable handler for describing a node by content, e.g. to derive a hash."""
+
+    def default(self, value, **kwargs):
+        """Replace connections by the key of their upstream node.
+
+        Parameters
+        ----------
+        value: Connection|any
+            The value to describe.
+        kwargs: dict
+            keys: dict of {uuid: key} shape for the upstream nodes.
+            tokens: dict of {id(value): token} shape for precomputed values.
+        """
+        if isinstance(value, Connection):
+            key = kwargs["keys"].get(value.uuid, str(value.uuid))
+            return ("znflow.Connection", key, _get_path(value))
+        if isinstance(value, CombinedConnections):
+            connections = [self.default(x, **kwargs) for x in value.connections]
+            return ("znflow.CombinedConnections", connections, value.item)
+        if isinstance(value, (FunctionFuture, Node)):
+            return ("znflow.Node", kwargs["keys"].get(value.uuid, str(value.uuid)))
+        return kwargs["tokens"].get(id(value), value)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import functools
 import inspect
+import threading
 import uuid
 
 from znflow.base import (
@@ -11,35 +12,59 @@ from znflow.base import (
     disable_graph,
     empty_graph,
     get_graph,
+    intern_connection,
 )
 
 
-def _mark_init_in_construction(cls, this_uuid=None):
+def _mark_init_in_construction(cls):
+    """Wrap '__init__' to set '_in_construction' to False once it has finished.
+
+    The wrapper is created once per class. If the class inherits a wrapped
+    '__init__', the original function is wrapped again for this class.
+    """
     if "__init__" in dir(cls):
+        func = cls.__init__
+        if hasattr(func, "_znflow_func"):
+            func = func._znflow_func
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            # read before '__init__', because pydantic replaces '__dict__'
+            this_uuid = getattr(self, "_znflow_uuid_", None)
+            func(self, *args, **kwargs)
+            self._in_construction = False
+            if this_uuid is not None:
+                self._uuid = this_uuid
+
+        wrapper._znflow_func = func
+        cls.__init__ = wrapper
+    return cls
 
-        def wrap_init(func):
-            if hasattr(func, "_znflow_func"):
-                # we wrap the original function, thereby updating the
-                # uuid to be unique.
-                func = func._znflow_func
 
-            @functools.wraps(cls.__init__)
-            def wrapper(self, *args, **kwargs):
-                func(self, *args, **kwargs)
-                self._in_construction = False
-                if this_uuid is not None:
-                    self._uuid = this_uuid
+def _prepare_class(cls) -> None:
+    """Instrument a Node class on its first instantiation.
 
-            wrapper._znflow_func = func
+    This can not happen in '__init_subclass__', because decorators
+    like 'dataclasses.dataclass' create '__init__' after the class.
+    The result is stored in '_znflow_class_' in the class namespace,
+    so subclasses are prepared separately.
+    """
+    _mark_init_in_construction(cls)
+    # 'object.__new__' does not accept the arguments of '__init__'.
+    pass_arguments = super(Node, cls).__new__ is not object.__new__
+    type.__setattr__(cls, "_znflow_class_", (pass_arguments, frozenset(dir(cls))))
 
-            return wrapper
 
-        cls.__init__ = wrap_init(cls.__init__)
-    return cls
+class Node(NodeBaseMixin):
+    """Base class for Nodes with attributes that can be connected.
 
+    While a graph is under construction, attribute access returns a
+    'Connection' instead of the value. Otherwise, the native attribute
+    access is used, see 'start_graph_construction'.
+    """
 
-class Node(NodeBaseMixin):
     _in_construction = True
+    _znflow_uuid_ = None
 
     def run(self):
         raise NotImplementedError
@@ -49,20 +74,23 @@ class Node(NodeBaseMixin):
 
     def __new__(cls, *args, **kwargs):
         this_uuid = uuid.uuid4()
-        try:
-            instance = super().__new__(cls, *args, **kwargs)
-        except TypeError:
-            # e.g. in dataclasses the arguments are passed to __new__
-            # but even dataclasses seem to have an __init__ afterwards.
-            # print("TypeError: ...")
+        if "_znflow_class_" not in cls.__dict__:
+            _prepare_class(cls)
+        if cls._znflow_class_[0]:
+            try:
+                instance = super().__new__(cls, *args, **kwargs)
+            except TypeError:
+                # e.g. in dataclasses the arguments are passed to __new__
+                # but even dataclasses seem to have an __init__ afterwards.
+                instance = super().__new__(cls)
+        else:
             instance = super().__new__(cls)
 
         try:
             instance.uuid = this_uuid
-            _mark_init_in_construction(cls, None)
         except AttributeError:
-            # pydantic edge case
-            _mark_init_in_construction(cls, this_uuid)
+            # pydantic edge case, the uuid is set after '__init__'
+            object.__setattr__(instance, "_znflow_uuid_", this_uuid)
 
         # Connect the Node to the Graph
         graph = get_graph()
@@ -70,41 +98,128 @@ class Node(NodeBaseMixin):
             graph.add_znflow_node(instance, this_uuid=this_uuid)
         return instance
 
-    def __getattribute__(self, item: str):
-        if item.startswith("_"):
-            return super().__getattribute__(item)
-        if self._graph_ not in [empty_graph, None]:
-            with disable_graph():
-                if item not in set(dir(self)):
-                    raise AttributeError(
-                        f"'{self.__class__.__name__}' object has no attribute '{item}'"
-                    )
-
-            if item not in self._protected_:
-                if self._in_construction:
-                    return super().__getattribute__(item)
-                return Connection(instance=self, attribute=item)
-        return super().__getattribute__(item)
-
-    def __setattr__(self, item, value) -> None:
-        super().__setattr__(item, value)
-        if self._graph_ not in [empty_graph, None] and isinstance(value, Connection):
-            if self.uuid not in self._graph_:
-                # self._external_ must be False
-                raise ValueError(f"'{self.uuid=}' not in '{self._graph_=}'")
-            if value.uuid not in self._graph_:
-                if value._external_:
-                    self._graph_.add_znflow_node(value.instance)
-                else:
-                    raise ValueError(f"'{value.uuid=}' not in '{self._graph_=}'")
-
-            self._graph_.add_edge(
-                value.uuid, self.uuid, u_attr=value.attribute, v_attr=item
-            )
 
+# Number of contexts with an active graph. Without any, Nodes use the native
+#  attribute access, because no graph can be modified.
+_graph_constructions = 0
+_graph_constructions_lock = threading.Lock()
 
-def nodify(function):
-    """Decorator to create a Node from a function."""
+
+def start_graph_construction() -> None:
+    """Install the graph aware attribute access on 'Node'.
+
+    Called by 'set_graph', before a graph becomes the active graph of a context.
+    """
+    global _graph_constructions
+    with _graph_constructions_lock:
+        _graph_constructions += 1
+        if _graph_constructions == 1:
+            Node.__getattribute__ = _getattribute
+            Node.__setattr__ = _setattr
+
+
+def finish_graph_construction() -> None:
+    """Restore the native attribute access, once no graph is under construction."""
+    global _graph_constructions
+    with _graph_constructions_lock:
+        _graph_constructions -= 1
+        if _graph_constructions == 0:
+            del Node.__getattribute__
+            del Node.__setattr__
+
+
+def _getattribute(self, item: str):
+    """'Node.__getattribute__' while a graph is under construction."""
+    if item.startswith("_"):
+        return super(Node, self).__getattribute__(item)
+    graph = self._graph_
+    if graph is not empty_graph and graph is not None:
+        if item not in type(self)._znflow_class_[1]:
+            with disable_graph():
+                missing = item not in set(dir(self))
+            if missing:
+                raise AttributeError(
+                    f"'{self.__class__.__name__}' object has no attribute '{item}'"
+                )
+
+        if item not in self._protected_:
+            if self._in_construction:
+                return super(Node, self).__getattribute__(item)
+            return intern_connection(
+                (self._uuid, item),
+                lambda: Connection(instance=self, attribute=item),
+            )
+    return super(Node, self).__getattribute__(item)
+
+
+def _setattr(self, item, value) -> None:
+    """'Node.__setattr__' while a graph is under construction."""
+    super(Node, self).__setattr__(item, value)
+    graph = self._graph_
+    if graph is not empty_graph and graph is not None and isinstance(value, Connection):
+        if self.uuid not in self._graph_:
+            # self._external_ must be False
+            raise ValueError(f"'{self.uuid=}' not in '{self._graph_=}'")
+        if value.uuid not in self._graph_:
+            if value._external_:
+                self._graph_.add_znflow_node(value.instance)
+            else:
+                raise ValueError(f"'{value.uuid=}' not in '{self._graph_=}'")
+
+        self._graph_.add_edge(value.uuid, self.uuid, u_attr=value.attribute, v_attr=item)
+
+
+def nodify(
+    function=None,
+    *,
+    cost: float = None,
+    resources: dict = None,
+    streaming: bool = False,
+    buffer_size: int = None,
+    timeout: float = None,
+):
+    """Decorator to create a Node from a function.
+
+    Attributes
+    ----------
+    cost : float, default=None
+        The estimated runtime of the function, see 'NodeBaseMixin._cost_'.
+        Can be used as '@nodify(cost=10)'.
+    resources : dict, default=None
+        The resources the function requires, see 'NodeBaseMixin._resources_'.
+        Can be used as '@nodify(resources={"cpus": 4, "memory": "8GB"})'.
+    streaming : bool, default=False
+        Receive the items of generator nodes incrementally,
+        see 'NodeBaseMixin._streaming_'.
+    buffer_size : int, default=None
+        The number of buffered items per streaming input,
+        see 'NodeBaseMixin._stream_buffer_'.
+    timeout : float, default=None
+        The maximum runtime in seconds, see 'NodeBaseMixin._timeout_'.
+    """
+    if function is None:
+        return functools.partial(
+            nodify,
+            cost=cost,
+            resources=resources,
+            streaming=streaming,
+            buffer_size=buffer_size,
+            timeout=timeout,
+        )
+
+    # attributes of every FunctionFuture created by this function
+    overrides = {
+        key: value
+        for key, value in [
+            ("_cost_", cost),
+            ("_resources_", resources),
+            ("_streaming_", True if streaming else None),
+            ("_stream_buffer_", buffer_size),
+            ("_timeout_", timeout),
+        ]
+        if value is not None
+    }
+    signature = None
 
     @functools.wraps(function)
     def wrapper(*args, **kwargs):
@@ -115,13 +230,18 @@ def nodify(function):
         TypeError:
             if the args / kwargs do not match the function signature
         """
+        nonlocal signature
         graph = get_graph()
         if graph is not empty_graph:
+            if signature is None:
+                signature = inspect.signature(function)
             # check if the args / kwargs match the function
-            inspect.signature(function).bind(*args, **kwargs)
+            signature.bind(*args, **kwargs)
 
             future = FunctionFuture(function, args, kwargs)
             future.uuid = uuid.uuid4()
+            if overrides:
+                vars(future).update(overrides)
 
             graph.add_znflow_node(future)
             return future
@@ -0,0 +1,312 @@
+"""Persist the state of a 'znflow.DiGraph' including the results of its nodes.
+
+The state is written to a directory. Large NumPy arrays, e.g. node results,
+are stored as individual '.npy' files and memory-mapped on load, so they
+are only paged in when accessed. Everything else is pickled into a single file.
+"""
+
+import contextlib
+import functools
+import hashlib
+import importlib
+import io
+import os
+import pathlib
+import pickle
+import threading
+import types
+import typing as t
+import uuid
+
+from znflow import handler
+from znflow.base import FunctionFuture, disable_graph
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+GRAPH_FILE = "graph.pkl"
+ARRAY_DIR = "arrays"
+
+
+def _get_wrapped_function(module: str, qualname: str) -> t.Callable:
+    """Get the original function of e.g. a 'znflow.nodify' decorated function."""
+    wrapper = functools.reduce(
+        getattr, qualname.split("."), importlib.import_module(module)
+    )
+    return wrapper.__wrapped__
+
+
+def get_type_name(obj) -> str:
+    """Get the qualified name of the type of a node, including the function."""
+    name = f"{type(obj).__module__}.{type(obj).__qualname__}"
+    if isinstance(obj, FunctionFuture):
+        name += f"[{obj.function.__module__}.{obj.function.__qualname__}]"
+    return name
+
+
+def get_fingerprint(node, keys: dict) -> t.Optional[str]:
+    """Hash the parameters of a node that has not been run yet.
+
+    Attributes
+    ----------
+    node : Node|FunctionFuture
+        The node to describe.
+    keys : dict
+        Stable keys of the upstream nodes, {uuid: key}. Connections are described
+        by these keys instead of the uuids, which change when rebuilding a graph.
+
+    Returns
+    -------
+    str|None:
+        The hash, or None if the parameters can not be pickled.
+    """
+    if isinstance(node, FunctionFuture):
+        parameters = {"args": node.args, "kwargs": node.kwargs}
+    else:
+        parameters = {
+            key: val for key, val in vars(node).items() if not key.startswith("_")
+        }
+    parameters = handler.ConnectionToKey()(parameters, keys=keys, tokens={})
+    file = io.BytesIO()
+    try:
+        with disable_graph():
+            Pickler(file).dump(sorted(parameters.items()))
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return None
+    return hashlib.sha256(file.getvalue()).hexdigest()
+
+
+class Pickler(pickle.Pickler):
+    """Pickler that supports the functions of 'znflow.nodify'.
+
+    The function of a FunctionFuture is hidden behind the 'nodify' wrapper
+    in its module and can not be pickled by reference directly.
+    """
+
+    def __init__(self, file):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def reducer_override(self, obj):
+        if isinstance(obj, types.FunctionType):
+            try:
+                wrapper = functools.reduce(
+                    getattr,
+                    obj.__qualname__.split("."),
+                    importlib.import_module(obj.__module__),
+                )
+            except (AttributeError, ImportError, TypeError):
+                return NotImplemented
+            if wrapper is not obj and getattr(wrapper, "__wrapped__", None) is obj:
+                return _get_wrapped_function, (obj.__module__, obj.__qualname__)
+        return NotImplemented
+
+
+class _Pickler(Pickler):
+    """Pickler that writes large NumPy arrays into separate '.npy' files."""
+
+    def __init__(self, file, directory: pathlib.Path, array_threshold: int):
+        super().__init__(file)
+        self.directory = directory
+        self.array_threshold = array_threshold
+        self.prefix = uuid.uuid4().hex
+        # 'persistent_id' is called before the memo lookup, so shared arrays
+        #  are tracked by id to write them only once.
+        self.arrays: t.Dict[int, str] = {}
+
+    def persistent_id(self, obj):
+        if (
+            np is not None
+            and isinstance(obj, np.ndarray)
+            and not obj.dtype.hasobject
+            and obj.nbytes >= self.array_threshold
+        ):
+            if id(obj) not in self.arrays:
+                name = f"{self.prefix}-{len(self.arrays)}.npy"
+                np.save(self.directory / ARRAY_DIR / name, obj, allow_pickle=False)
+                self.arrays[id(obj)] = name
+            return ("ndarray", self.arrays[id(obj)])
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    """Unpickler that memory-maps the arrays written by '_Pickler'."""
+
+    def __init__(self, file, directory: pathlib.Path):
+        super().__init__(file)
+        self.directory = directory
+        self.arrays: t.Dict[str, t.Any] = {}
+
+    def persistent_load(self, pid):
+        kind, name = pid
+        if kind != "ndarray":
+            raise pickle.UnpicklingError(f"Unsupported persistent id '{pid}'.")
+        if np is None:
+            raise ImportError("NumPy is required to load arrays from a saved graph.")
+        if name not in self.arrays:
+            # copy-on-write, so the results can be modified without changing the file.
+            self.arrays[name] = np.load(self.directory / ARRAY_DIR / name, mmap_mode="c")
+        return self.arrays[name]
+
+
+def dump(state: dict, path: t.Union[str, os.PathLike], array_threshold: int) -> None:
+    """Write the state of a graph to the directory 'path'.
+
+    Attributes
+    ----------
+    state : dict
+        The state of the graph, including the node instances.
+    path : str|os.PathLike
+        The directory to write to. Existing graph files are replaced.
+    array_threshold : int
+        NumPy arrays with at least this number of bytes are stored as '.npy' files.
+    """
+    directory = pathlib.Path(path)
+    (directory / ARRAY_DIR).mkdir(parents=True, exist_ok=True)
+    tmp_file = directory / f"{GRAPH_FILE}.tmp"
+    with disable_graph(), tmp_file.open("wb") as file:
+        pickler = _Pickler(file, directory, array_threshold)
+        pickler.dump(state)
+    os.replace(tmp_file, directory / GRAPH_FILE)
+
+    # Arrays are written with a new prefix every time, so memory-mapped arrays
+    #  of a previously loaded graph are never overwritten.
+    arrays = set(pickler.arrays.values())
+    for array_file in (directory / ARRAY_DIR).glob("*.npy"):
+        if array_file.name not in arrays:
+            with contextlib.suppress(OSError):
+                array_file.unlink()
+
+
+def load(path: t.Union[str, os.PathLike]) -> dict:
+    """Read the state of a graph written by 'dump'."""
+    directory = pathlib.Path(path)
+    with disable_graph(), (directory / GRAPH_FILE).open("rb") as file:
+        return _Unpickler(file, directory).load()
+
+
+def _matches(saved: tuple, current: tuple) -> bool:
+    """Check if an entry of the checkpoint index describes the current node."""
+    if saved[1] != current[1]:
+        return False
+    if saved[0] == current[0] or saved[2] is None or current[2] is None:
+        return True
+    return saved[2] == current[2]
+
+
+class Checkpoint:
+    """Persist the nodes of a graph as they finish, to resume an interrupted run.
+
+    Every finished node is written to its own directory, named after the
+    position of the node in the graph. On resume, the checkpointed nodes must
+    be the first nodes of the graph. They are matched by uuid or, if the graph
+    was rebuilt in a new process, by their type and a fingerprint of their
+    parameters, see 'get_fingerprint'. The fingerprint is taken before the
+    node runs for the first time and stored in the node data of the graph.
+
+    Attributes
+    ----------
+    path : str|os.PathLike
+        The checkpoint directory.
+    graph : DiGraph
+        The graph to checkpoint.
+    array_threshold : int, default=65536
+        NumPy arrays with at least this number of bytes are stored as '.npy' files.
+    """
+
+    INDEX_FILE = "index.pkl"
+    NODE_DIR = "nodes"
+
+    def __init__(self, path, graph, array_threshold: int = 2**16):
+        self.directory = pathlib.Path(path)
+        self.graph = graph
+        self.array_threshold = array_threshold
+        self.positions: t.Dict[t.Any, int] = {}
+        self.saved = set()
+        self._lock = threading.Lock()
+
+    def _get_index(self) -> t.List[t.Tuple[t.Any, str, t.Optional[str]]]:
+        keys = {node_uuid: idx for idx, node_uuid in enumerate(self.graph)}
+        index = []
+        for node_uuid in self.graph:
+            data = self.graph.nodes[node_uuid]
+            if "fingerprint" not in data:
+                # the parameters of a node that has already run include its outputs
+                data["fingerprint"] = (
+                    None
+                    if data.get("available", False)
+                    else get_fingerprint(data["value"], keys)
+                )
+            index.append((node_uuid, get_type_name(data["value"]), data["fingerprint"]))
+        return index
+
+    def write_index(self) -> None:
+        """Write the position, type and fingerprint of all nodes of the graph."""
+        index = self._get_index()
+        self.positions = {entry[0]: idx for idx, entry in enumerate(index)}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.directory / f"{self.INDEX_FILE}.tmp"
+        with tmp_file.open("wb") as file:
+            pickle.dump(index, file)
+        os.replace(tmp_file, self.directory / self.INDEX_FILE)
+
+    def restore(self) -> t.List[t.Any]:
+        """Restore all checkpointed nodes and mark them as available.
+
+        Returns
+        -------
+        list:
+            The uuids of the restored nodes.
+
+        Raises
+        ------
+        ValueError
+            If the checkpointed nodes do not match the nodes of the graph.
+        """
+        with (self.directory / self.INDEX_FILE).open("rb") as file:
+            saved_index = pickle.load(file)
+        index = self._get_index()
+        if len(saved_index) > len(index) or any(
+            not _matches(saved, current) for saved, current in zip(saved_index, index)
+        ):
+            raise ValueError(
+                f"The graph does not match the checkpoint in '{self.directory}'."
+            )
+
+        restored = []
+        for position, (node_uuid, *_) in enumerate(index[: len(saved_index)]):
+            node_dir = self.directory / self.NODE_DIR / str(position)
+            if not (node_dir / GRAPH_FILE).exists():
+                continue
+            node = self.graph.nodes[node_uuid]["value"]
+            state = load(node_dir)
+            if isinstance(node, FunctionFuture):
+                node.result = state
+            else:
+                node.__dict__.update(state)
+            self.graph.nodes[node_uuid]["available"] = True
+            self.saved.add(node_uuid)
+            restored.append(node_uuid)
+        return restored
+
+    def save_node(self, node_uuid) -> None:
+        """Write the outputs of a finished node."""
+        with self._lock:
+            if node_uuid in self.saved:
+                return
+            if node_uuid not in self.positions:
+                # the node was added after the checkpoint was started
+                self.write_index()
+            self.saved.add(node_uuid)
+            position = self.positions[node_uuid]
+        node = self.graph.nodes[node_uuid]["value"]
+        if isinstance(node, FunctionFuture):
+            state = node.result
+        else:
+            state = {key: val for key, val in node.__dict__.items() if key != "_uuid"}
+        dump(
+            state,
+            self.directory / self.NODE_DIR / str(position),
+            array_threshold=self.array_threshold,
+        )
@@ -0,0 +1,209 @@
+"""Transfer large NumPy arrays between processes through shared memory.
+
+Instead of pickling the data of large arrays, they are placed in
+'multiprocessing.shared_memory' blocks and only a lightweight 'SharedArray'
+handle is pickled. The receiving process maps the block without copying.
+
+The process that runs the graph owns all blocks. Every block is reference
+counted by the arrays that map it and is released, once the graph no longer
+holds any of these arrays.
+"""
+
+import contextlib
+import dataclasses
+import io
+import pickle
+import threading
+import typing as t
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+
+from znflow import persistence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@dataclasses.dataclass(frozen=True)
+class SharedArray:
+    """Picklable handle to a C-contiguous array inside a shared memory block."""
+
+    name: str
+    shape: tuple
+    dtype: str
+    offset: int = 0
+
+
+def ensure_tracker_running() -> None:
+    """Start the resource tracker before creating worker processes.
+
+    The workers then share the resource tracker of this process. Otherwise,
+    every worker starts its own tracker, which unlinks the blocks created by
+    the worker when it shuts down.
+    """
+    resource_tracker.ensure_running()
+
+
+def _get_address(array) -> int:
+    return array.__array_interface__["data"][0]
+
+
+class SharedMemoryRegistry:
+    """The shared memory blocks mapped by the current process.
+
+    Attributes
+    ----------
+    owner : bool
+        If True, blocks are unlinked once they are no longer used.
+        Otherwise, they are only closed and the owning process
+        is responsible for unlinking them.
+    """
+
+    def __init__(self, owner: bool):
+        self.owner = owner
+        self._lock = threading.Lock()
+        # name: [SharedMemory, number of mapped root arrays]
+        self._blocks: t.Dict[str, list] = {}
+        # id(root array): SharedArray
+        self._arrays: t.Dict[int, SharedArray] = {}
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def attach(self, handle: SharedArray):
+        """Map the array of the handle without copying."""
+        with self._lock:
+            if handle.name not in self._blocks:
+                self._blocks[handle.name] = [
+                    shared_memory.SharedMemory(name=handle.name),
+                    0,
+                ]
+            block = self._blocks[handle.name]
+            block[1] += 1
+        array = np.ndarray(
+            handle.shape, dtype=handle.dtype, buffer=block[0].buf, offset=handle.offset
+        )
+        self._arrays[id(array)] = handle
+        weakref.finalize(array, self._release, handle.name, id(array))
+        return array
+
+    def _release(self, name: str, array_id: int) -> None:
+        with self._lock:
+            self._arrays.pop(array_id, None)
+            block = self._blocks[name]
+            block[1] -= 1
+            if block[1] > 0:
+                return
+            del self._blocks[name]
+        # at interpreter exit, the arrays might still be alive
+        with contextlib.suppress(BufferError):
+            block[0].close()
+        if self.owner:
+            with contextlib.suppress(FileNotFoundError):
+                block[0].unlink()
+
+    def get_handle(self, array) -> t.Optional[SharedArray]:
+        """Get the handle of an array that is mapped from a shared memory block."""
+        if not array.flags.c_contiguous:
+            return None
+        root = array
+        while isinstance(root, np.ndarray):
+            handle = self._arrays.get(id(root))
+            if handle is not None:
+                offset = handle.offset + _get_address(array) - _get_address(root)
+                return SharedArray(handle.name, array.shape, array.dtype.str, offset)
+            root = root.base
+        return None
+
+    def export(self, array) -> t.Tuple[SharedArray, t.Any]:
+        """Place an array in shared memory, unless it is already located there.
+
+        Returns
+        -------
+        SharedArray:
+            The handle to the array.
+        np.ndarray|None:
+            If this process owns the block, a mapped array that must be kept
+            alive until the receiving process has attached the handle.
+        """
+        handle = self.get_handle(array)
+        if handle is not None:
+            return handle, array
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        handle = SharedArray(block.name, array.shape, array.dtype.str)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        if not self.owner:
+            # The owning process takes over the block when attaching it.
+            block.close()
+            return handle, None
+        with self._lock:
+            self._blocks[block.name] = [block, 0]
+        return handle, self.attach(handle)
+
+
+class _Pickler(persistence.Pickler):
+    """Pickler that replaces large NumPy arrays by 'SharedArray' handles."""
+
+    def __init__(self, file, registry: SharedMemoryRegistry, threshold: int):
+        super().__init__(file)
+        self.registry = registry
+        self.threshold = threshold
+        self.keepalive = []
+        # 'persistent_id' is called before the memo lookup, so shared arrays
+        #  are tracked by id to export them only once.
+        self.handles: t.Dict[int, SharedArray] = {}
+
+    def persistent_id(self, obj):
+        if (
+            np is not None
+            and isinstance(obj, np.ndarray)
+            and not obj.dtype.hasobject
+            and obj.nbytes >= self.threshold
+        ):
+            if id(obj) not in self.handles:
+                handle, array = self.registry.export(obj)
+                self.keepalive.extend([obj, array])
+                self.handles[id(obj)] = handle
+            return self.handles[id(obj)]
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    """Unpickler that maps 'SharedArray' handles from shared memory."""
+
+    def __init__(self, file, registry: SharedMemoryRegistry):
+        super().__init__(file)
+        self.registry = registry
+        self.arrays: t.Dict[SharedArray, t.Any] = {}
+
+    def persistent_load(self, pid):
+        if not isinstance(pid, SharedArray):
+            raise pickle.UnpicklingError(f"Unsupported persistent id '{pid}'.")
+        if pid not in self.arrays:
+            self.arrays[pid] = self.registry.attach(pid)
+        return self.arrays[pid]
+
+
+def dumps(
+    obj, registry: SharedMemoryRegistry, threshold: int
+) -> t.Tuple[bytes, t.List[t.Any]]:
+    """Pickle an object and place large NumPy arrays in shared memory.
+
+    Returns
+    -------
+    bytes:
+        The pickled object.
+    list:
+        Arrays that must be kept alive until the object has been loaded.
+    """
+    file = io.BytesIO()
+    pickler = _Pickler(file, registry, threshold)
+    pickler.dump(obj)
+    return file.getvalue(), pickler.keepalive
+
+
+def loads(data: bytes, registry: SharedMemoryRegistry):
+    """Unpickle an object written by 'dumps'."""
+    return _Unpickler(io.BytesIO(data), registry).load()
@@ -0,0 +1,67 @@
+"""Spill large node outputs to memory-mapped files.
+
+NumPy arrays are stored as '.npy' files and replaced by a copy-on-write
+'np.memmap', which behaves like the original array. The data is only paged
+in from disk when it is accessed. Other values, e.g. bytes, are kept in memory,
+because a mapped replacement would not behave like the original value.
+"""
+
+import contextlib
+import os
+import pathlib
+import tempfile
+import typing as t
+import uuid
+import weakref
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _unlink(path: pathlib.Path) -> None:
+    with contextlib.suppress(OSError):
+        path.unlink()
+
+
+class SpillStore:
+    """Write large values to a directory and map them back from disk.
+
+    A spilled file is deleted, once the mapped value is garbage collected.
+
+    Attributes
+    ----------
+    threshold : int
+        Values with at least this number of bytes are spilled.
+    directory : str|os.PathLike, default=None
+        The directory to write to. Defaults to a temporary directory,
+        which is removed together with the store.
+    """
+
+    def __init__(
+        self, threshold: int, directory: t.Optional[t.Union[str, os.PathLike]] = None
+    ):
+        self.threshold = threshold
+        self._tmp_dir = None
+        if directory is None:
+            self._tmp_dir = tempfile.TemporaryDirectory(prefix="znflow-spill-")
+            directory = self._tmp_dir.name
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def spill(self, value) -> t.Any:
+        """Spill the value, if it is a large array, and return the mapped value."""
+        if (
+            np is None
+            or not isinstance(value, np.ndarray)
+            or isinstance(value, np.memmap)
+            or value.dtype.hasobject
+            or value.nbytes < self.threshold
+        ):
+            return value
+        path = self.directory / f"{uuid.uuid4().hex}.npy"
+        np.save(path, value, allow_pickle=False)
+        mapped = np.load(path, mmap_mode="c")
+        weakref.finalize(mapped, _unlink, path)
+        return mapped
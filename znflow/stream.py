@@ -0,0 +1,150 @@
+"""Stream the items of generator nodes to their consumers.
+
+If a node function or 'Node.run' is a generator, the node produces a 'Stream'.
+The generator is driven by a background thread, which pushes every item into
+one subscription per consumer. Consumers that are declared as streaming iterate
+their subscription while the producer is still running. All other consumers
+receive the list of all items.
+
+A subscription is bounded, once its consumer has started iterating it.
+If the consumer falls behind, the producer blocks until there is room again.
+Subscriptions of consumers that have not started yet buffer all items, so
+that running the consumers one after another can not deadlock.
+"""
+
+import collections
+import threading
+import typing as t
+
+DEFAULT_BUFFER_SIZE = 16
+
+_END = object()
+
+
+class _Error:
+    def __init__(self, exception: BaseException):
+        self.exception = exception
+
+
+class Subscription:
+    """Iterator over the items of a 'Stream' with a bounded buffer.
+
+    Attributes
+    ----------
+    stream : Stream
+        The stream this subscription belongs to.
+    buffer_size : int
+        The maximum number of buffered items, once the iteration has started.
+    """
+
+    def __init__(self, stream: "Stream", buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.stream = stream
+        self.buffer_size = max(buffer_size, 1)
+        self.active = False
+        self.closed = False
+        self._items = collections.deque()
+        self._condition = threading.Condition()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self._condition:
+            if not self.active:
+                self.active = True
+                self._condition.notify_all()
+        self.stream.start()
+        with self._condition:
+            while not self._items:
+                self._condition.wait()
+            item = self._items[0]
+            if item is _END:
+                raise StopIteration
+            self._items.popleft()
+            self._condition.notify_all()
+        if isinstance(item, _Error):
+            raise item.exception
+        return item
+
+    def _put(self, item) -> None:
+        """Add an item, blocking while the buffer of an active consumer is full."""
+        with self._condition:
+            while (
+                self.active and not self.closed and len(self._items) >= self.buffer_size
+            ):
+                self._condition.wait()
+            if not self.closed:
+                self._items.append(item)
+                self._condition.notify_all()
+
+    def close(self) -> None:
+        """Stop receiving items, so the producer is not blocked by this consumer."""
+        with self._condition:
+            self.closed = True
+            self._items.clear()
+            self._items.append(_END)
+            self._condition.notify_all()
+
+
+class Stream:
+    """The items produced by a generator node.
+
+    Attributes
+    ----------
+    iterator : Iterator
+        The generator that produces the items.
+    """
+
+    def __init__(self, iterator: t.Iterator):
+        self.iterator = iterator
+        self.subscriptions: t.List[Subscription] = []
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.iterator!r})"
+
+    def __iter__(self):
+        return self.subscribe()
+
+    @property
+    def started(self) -> bool:
+        return self._thread is not None
+
+    def subscribe(self, buffer_size: int = DEFAULT_BUFFER_SIZE) -> Subscription:
+        """Create a new subscription, which receives all items of the stream.
+
+        Raises
+        ------
+        RuntimeError
+            If the stream has already started, because the
+            subscription would miss the items produced so far.
+        """
+        with self._lock:
+            if self.started:
+                raise RuntimeError(
+                    f"Can not subscribe to '{self}', because it has already started."
+                )
+            subscription = Subscription(self, buffer_size)
+            self.subscriptions.append(subscription)
+            return subscription
+
+    def start(self) -> None:
+        """Start producing items in a background thread."""
+        with self._lock:
+            if self.started:
+                return
+            self._thread = threading.Thread(target=self._produce, daemon=True)
+            self._thread.start()
+
+    def _produce(self) -> None:
+        try:
+            for item in self.iterator:
+                for subscription in self.subscriptions:
+                    subscription._put(item)
+        except BaseException as err:  # forward everything to the consumers
+            for subscription in self.subscriptions:
+                subscription._put(_Error(err))
+        finally:
+            for subscription in self.subscriptions:
+                subscription._put(_END)
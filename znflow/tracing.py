@@ -0,0 +1,158 @@
+"""Trace graph construction with structured events.
+
+Tracing is disabled by default and costs a single check of the module-level
+'enabled' flag per call site. Events are only created while at least one
+sink is enabled, and their fields are only formatted by sinks that need text.
+
+    with tracing.capture() as sink:
+        with znflow.DiGraph():
+            ...
+    print(sink.events)
+
+Sinks are callables that receive every 'Event'. 'LoggingSink', 'MemorySink'
+and 'FileSink' are provided, but every callable can be passed to 'enable'.
+"""
+
+import contextlib
+import dataclasses
+import json
+import logging
+import os
+import threading
+import time
+import typing as t
+
+enabled: bool = False
+
+_sinks: t.Tuple[t.Callable[["Event"], None], ...] = ()
+
+
+def _safe_repr(value) -> str:
+    try:
+        return repr(value)
+    except Exception:  # e.g. zninit does not like __repr__ on unfinished nodes
+        return object.__repr__(value)
+
+
+@dataclasses.dataclass(frozen=True)
+class Event:
+    """A single trace event.
+
+    Attributes
+    ----------
+    name : str
+        The kind of event, e.g. 'add_edge'.
+    fields : dict
+        The objects involved in the event. They are stored as is
+        and only converted to text in 'format' or 'to_dict'.
+    time : float
+        The time of the event, see 'time.time'.
+    """
+
+    name: str
+    fields: t.Dict[str, t.Any]
+    time: float = dataclasses.field(default_factory=time.time)
+
+    def format(self) -> str:
+        fields = ", ".join(f"{key}={_safe_repr(val)}" for key, val in self.fields.items())
+        return f"{self.name}: {fields}"
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "time": self.time,
+            "fields": {key: _safe_repr(val) for key, val in self.fields.items()},
+        }
+
+
+class LoggingSink:
+    """Write events to a logger.
+
+    Attributes
+    ----------
+    logger : logging.Logger, default=None
+        The logger to write to. Defaults to the 'znflow.tracing' logger.
+    level : int, default=logging.DEBUG
+        The level of the log records.
+    """
+
+    def __init__(self, logger: logging.Logger = None, level: int = logging.DEBUG):
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def __call__(self, event: Event) -> None:
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, event.format())
+
+
+class MemorySink:
+    """Keep all events in memory.
+
+    Attributes
+    ----------
+    events : list[Event]
+        The captured events in the order they were emitted.
+    """
+
+    def __init__(self):
+        self.events: t.List[Event] = []
+
+    def __call__(self, event: Event) -> None:
+        self.events.append(event)
+
+
+class FileSink:
+    """Append events as JSON lines to a file.
+
+    Attributes
+    ----------
+    path : str|os.PathLike
+        The file to append to.
+    """
+
+    def __init__(self, path: t.Union[str, os.PathLike]):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Event) -> None:
+        line = json.dumps(event.to_dict())
+        with self._lock, open(self.path, "a") as file:
+            file.write(line + "\n")
+
+
+def enable(*sinks: t.Callable[[Event], None]) -> None:
+    """Enable tracing and send all events to the given sinks."""
+    global enabled, _sinks
+    _sinks = (*_sinks, *sinks)
+    enabled = bool(_sinks)
+
+
+def disable(*sinks: t.Callable[[Event], None]) -> None:
+    """Remove the given sinks, or all sinks if none are given."""
+    global enabled, _sinks
+    _sinks = tuple(x for x in _sinks if sinks and x not in sinks)
+    enabled = bool(_sinks)
+
+
+@contextlib.contextmanager
+def capture() -> t.Iterator[MemorySink]:
+    """Capture all events emitted inside the context in a 'MemorySink'."""
+    sink = MemorySink()
+    enable(sink)
+    try:
+        yield sink
+    finally:
+        disable(sink)
+
+
+def emit(name: str, **fields) -> None:
+    """Send an event to all sinks.
+
+    Call sites should check 'tracing.enabled' first,
+    to avoid collecting the fields while tracing is disabled.
+    """
+    if not enabled:
+        return
+    event = Event(name, fields)
+    for sink in _sinks:
+        sink(event)
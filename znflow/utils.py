@@ -35,34 +35,41 @@ class IterableHandler(abc.ABC):
     def handle(self, value, **kwargs):
         """Handle the iterable."""
         self.updated = False
-        return self._handle(value, **kwargs)
-
-    @functools.singledispatchmethod
-    def _handle(self, value, **kwargs):
-        """Fallback handling if no siggledispatch was triggered."""
-
-        result = self.default(value, **kwargs)
-        if result is not value:
-            self.updated = True
-        return result
-
-    @_handle.register
-    def _(self, value: list, **kwargs) -> list:
-        """Handle a list."""
-        return [self._handle(x, **kwargs) for x in value]
-
-    @_handle.register
-    def _(self, value: tuple, **kwargs) -> tuple:
-        """Handle a tuple."""
-        # without 'tuple' it would be a generator
-        return tuple(self._handle(x, **kwargs) for x in value)
-
-    @_handle.register
-    def _(self, value: set, **kwargs) -> set:
-        """Handle a set."""
-        return {self._handle(x, **kwargs) for x in value}
-
-    @_handle.register
-    def _(self, value: dict, **kwargs) -> dict:
-        """Handle a dict."""
-        return {key: self._handle(val, **kwargs) for key, val in value.items()}
+        return _handle(value, self, **kwargs)
+
+
+# The handler is passed explicitly instead of using a 'singledispatchmethod',
+#  which creates a new bound method on every access during the recursion.
+@functools.singledispatch
+def _handle(value, handler: IterableHandler, /, **kwargs):
+    """Fallback handling if no siggledispatch was triggered."""
+
+    result = handler.default(value, **kwargs)
+    if result is not value:
+        handler.updated = True
+    return result
+
+
+@_handle.register
+def _(value: list, handler: IterableHandler, /, **kwargs) -> list:
+    """Handle a list."""
+    return [_handle(x, handler, **kwargs) for x in value]
+
+
+@_handle.register
+def _(value: tuple, handler: IterableHandler, /, **kwargs) -> tuple:
+    """Handle a tuple."""
+    # without 'tuple' it would be a generator
+    return tuple(_handle(x, handler, **kwargs) for x in value)
+
+
+@_handle.register
+def _(value: set, handler: IterableHandler, /, **kwargs) -> set:
+    """Handle a set."""
+    return {_handle(x, handler, **kwargs) for x in value}
+
+
+@_handle.register
+def _(value: dict, handler: IterableHandler, /, **kwargs) -> dict:
+    """Handle a dict."""
+    return {key: _handle(val, handler, **kwargs) for key, val in value.items()}
@@ -1,22 +1,76 @@
 """The 'ZnFlow' visualization module."""
 
 import math
+import typing as t
 
 import networkx as nx
 
 
+def get_counts(graph) -> t.Dict[t.Any, int]:
+    """Get the number of successors for every node on the graph.
+
+    The counts are computed in a single pass in topological order,
+    so this scales linearly with the number of nodes and edges.
+    Cycles, e.g. from collapsed groups, are treated as a single node.
+    """
+    if not nx.is_directed_acyclic_graph(graph):
+        condensed = nx.condensation(graph)
+        counts = get_counts(condensed)
+        return {node: counts[idx] for node, idx in condensed.graph["mapping"].items()}
+    counts = {}
+    for node in nx.topological_sort(graph):
+        predecessors = list(graph.predecessors(node))
+        counts[node] = sum(counts[x] for x in predecessors) if predecessors else 1
+    return counts
+
+
 def get_count(node, graph) -> int:
     """Get the number of successors for the given node."""
-    successors = list(graph.predecessors(node))
-    return sum(get_count(x, graph) for x in successors) if len(successors) else 1
+    return get_counts(graph.subgraph(nx.ancestors(graph, node) | {node}))[node]
 
 
 def get_colors(graph, log) -> list:
     """Get the color for each Node on the graph."""
-    colors = [get_count(node, graph) for node in graph]
+    counts = get_counts(graph)
+    colors = [counts[node] for node in graph]
     return [math.log(x) for x in colors] if log else colors
 
 
-def draw(graph, *args, log=True, **kwargs):
-    """Draw the graph using networkx."""
+def collapse_groups(graph) -> nx.DiGraph:
+    """Replace all nodes of a group by a single node named after the group."""
+    mapping = {}
+    for names, group in getattr(graph, "groups", {}).items():
+        for node_uuid in group:
+            mapping[node_uuid] = "/".join(names)
+    collapsed = nx.DiGraph()
+    collapsed.add_nodes_from(mapping.get(node, node) for node in graph)
+    collapsed.add_edges_from(
+        (mapping.get(u, u), mapping.get(v, v))
+        for u, v in graph.edges()
+        if mapping.get(u, u) != mapping.get(v, v)
+    )
+    return collapsed
+
+
+def draw(graph, *args, log=True, collapse=False, max_nodes=None, **kwargs):
+    """Draw the graph using networkx.
+
+    Attributes
+    ----------
+    log : bool, default=True
+        Use the logarithm of the number of successors as color.
+    collapse : bool, default=False
+        Draw every group of a 'znflow.DiGraph' as a single node.
+    max_nodes : int, default=None
+        Only draw the first 'max_nodes' nodes in topological order.
+        This keeps drawing large graphs fast and readable.
+    """
+    if collapse:
+        graph = collapse_groups(graph)
+    if max_nodes is not None and len(graph) > max_nodes:
+        if nx.is_directed_acyclic_graph(graph):
+            nodes = list(nx.topological_sort(graph))
+        else:
+            nodes = list(graph)
+        graph = graph.subgraph(nodes[:max_nodes])
     nx.draw(graph, *args, node_color=get_colors(graph, log), **kwargs)